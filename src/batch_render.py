@@ -0,0 +1,120 @@
+'''
+Headless batch renderer: renders .obj files at a list of orientations and zoom levels straight to PNG.
+The files are spread across a pool of processes. Run it from the src folder:
+	python -m batch_render ../Objects/*.obj --out thumbs --size 256 --views 0,0,0 0,90,0 --zooms 5 50 --sheet
+'''
+import obj_files_handler
+import offscreen
+from geometry import Geometry
+from rasterizer import Rasterizer
+
+import os
+import sys
+import glob
+import math
+import time
+import argparse
+import functools
+import multiprocessing
+
+DEFAULT_VIEWS = ('0,0,0', '0,90,0', '0,180,0', '30,-45,0') # X, Y, Z rotations in degrees
+
+def parse_view(view: str) -> 'tuple(float, float, float)':
+	'''"x,y,z" in degrees to radians'''
+	angles = [math.radians(float(angle)) for angle in view.split(',')]
+	if len(angles) != 3:
+		raise argparse.ArgumentTypeError(f"A view is 3 comma-separated angles (X,Y,Z in degrees), got '{view}'")
+	return tuple(angles)
+
+def find_models(paths: 'list(str)') -> 'list(str)':
+	'''Expand the folders given on the command line into the .obj files they contain (recursively)'''
+	models = []
+	for path in paths:
+		if os.path.isdir(path):
+			models.extend(sorted(glob.glob(os.path.join(path, '**', '*.obj'), recursive=True)))
+		else:
+			models.append(path)
+	return models
+
+def render_model(options: dict, path: str) -> 'tuple(str, int, str)':
+	'''
+	@brief: Worker body: render every view of a model to PNG
+	@return: (file name, number of images written, error message or None)
+	'''
+	name = os.path.splitext(os.path.basename(path))[0]
+	try:
+		with open(path) as file:
+			mesh = obj_files_handler.extract_data(file, options['triangulate'])
+		size = options['size']
+		geometry = Geometry(size, size, lod_targets=()) # No interaction here, no need for simplified levels
+		geometry.upload_object(mesh)
+		rasterizer = Rasterizer(size, size)
+
+		frames = []
+		for zoom in options['zooms']:
+			geometry.set_zoom(zoom)
+			for i, angles in enumerate(options['views']):
+				geometry.reset_rotation(*angles)
+				if options['fit']:
+					offscreen.fit_view(geometry, size, size)
+				frame = offscreen.render_view(
+					geometry, size, size, options['fill'], options['line'], options['background'],
+					cull_back_faces=options['cull'], wireframe=options['wireframe'], rasterizer=rasterizer
+				)
+				frames.append(frame)
+				if not options['sheet_only']:
+					offscreen.write_png(os.path.join(options['out'], f'{name}_z{zoom:g}_{i}.png'), frame)
+
+		written = 0 if options['sheet_only'] else len(frames)
+		if options['sheet'] or options['sheet_only']:
+			# One row per zoom level, one column per view
+			sheet = offscreen.contact_sheet(frames, len(options['views']), options['background'])
+			offscreen.write_png(os.path.join(options['out'], f'{name}_sheet.png'), sheet)
+			written += 1
+		return name, written, None
+	except Exception as e:
+		return name, 0, f'{type(e).__name__}: {e}'
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Render .obj files to PNG without a display')
+	parser.add_argument('models', nargs='+', help='.obj files, or folders of .obj files, to render')
+	parser.add_argument('--out', default='renders', help='Output folder (default: %(default)s)')
+	parser.add_argument('--size', type=int, default=256, help='Width and height of every image (default: %(default)s)')
+	parser.add_argument('--views', nargs='+', type=parse_view, default=[parse_view(view) for view in DEFAULT_VIEWS], metavar='X,Y,Z', help='Orientations in degrees (default: %s)' % ' '.join(DEFAULT_VIEWS))
+	parser.add_argument('--zooms', nargs='+', type=float, default=[5.0], help='Zoom levels, the lower the stronger the perspective (default: %(default)s)')
+	parser.add_argument('--no-fit', dest='fit', action='store_false', help="Keep the GUI's scale and position instead of fitting the object to the image")
+	parser.add_argument('--fill', default='#000000', help="Fill color, '' for no fill (default: %(default)s)")
+	parser.add_argument('--line', default='#0000FF', help='Line color (default: %(default)s)')
+	parser.add_argument('--background', default='#FFFFFF', help='Background color (default: %(default)s)')
+	parser.add_argument('--cull', action='store_true', help='Cull the back faces')
+	parser.add_argument('--wireframe', action='store_true', help='Draw the unique edges only')
+	parser.add_argument('--triangulate', action='store_true', help='Triangulate the faces when loading them (the fill of concave polygons stays right)')
+	parser.add_argument('--sheet', action='store_true', help='Also write a contact sheet of all the views of each model')
+	parser.add_argument('--sheet-only', action='store_true', help='Only write the contact sheets')
+	parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Number of worker processes (default: %(default)s)')
+	args = parser.parse_args()
+
+	models = find_models(args.models)
+	os.makedirs(args.out, exist_ok=True)
+	options = {key: getattr(args, key) for key in ('out', 'size', 'views', 'zooms', 'fit', 'fill', 'line', 'background', 'cull', 'wireframe', 'triangulate', 'sheet', 'sheet_only')}
+
+	start = time.perf_counter()
+	failures, images = 0, 0
+	with multiprocessing.get_context('spawn').Pool(max(args.jobs, 1)) as pool:
+		# Results come back as soon as each model is done, whatever the order
+		for name, written, error in pool.imap_unordered(functools.partial(render_model, options), models):
+			images += written
+			if error:
+				failures += 1
+				print(f'{name}: FAILED ({error})')
+			else:
+				print(f'{name}: {written} image(s)')
+	elapsed = time.perf_counter() - start
+
+	rendered = len(models) - failures
+	print(f'\n{rendered} model(s), {images} image(s) in {elapsed:.2f}s: {rendered/elapsed:.2f} models/s with {args.jobs} process(es)')
+	return 1 if failures else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,158 @@
+'''
+Headless benchmark of the rendering pipeline over the bundled models (no display needed).
+Run it from the src folder:
+	python -m bench                                # time every Objects/*.obj, write bench_results.json
+	python -m bench --save-baseline baseline.json  # also keep the results as the reference
+	python -m bench --baseline baseline.json       # fail (exit code 1) on regressions against the reference
+	python -m bench --scaling 1000000              # also time the projection of a 1M verticies cloud on 1, 2, 4, ... threads
+'''
+import obj_files_handler
+from geometry import Geometry, max_threads
+from mesh import Mesh
+
+import os
+import sys
+import glob
+import json
+import math
+import time
+import argparse
+import platform
+import numpy as np
+
+OBJECTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Objects')
+CANVAS_SIZE = (1000, 570)
+SIZES = ('verticies', 'faces', 'mesh_mb', 'lists_mb') # Reported along the timings, never compared
+NOISE_FLOOR_MS = 0.5 # Slowdowns smaller than that are timer noise on sub-millisecond stages, never regressions
+
+def measure(f: 'callable', repeats: int) -> float:
+	'''Median runtime of f in ms, after an untimed warm-up call (JIT compilation, caches loading)'''
+	f()
+	durations = []
+	for _ in range(repeats):
+		start = time.perf_counter_ns()
+		f()
+		durations.append((time.perf_counter_ns() - start)/1e6)
+	return float(np.median(durations))
+
+def orientations(count: int) -> 'list(tuple(float, float, float))':
+	'''Sweep of orientations spread over the three axis'''
+	return [(2*math.pi*i/count, math.pi*i/count, -math.pi*i/count) for i in range(count)]
+
+def bench_model(path: str, repeats: int, sweep: int, threads: int = None) -> dict:
+	'''
+	@brief: Time every stage of the pipeline on a model
+	@return: Median durations in ms: parse, upload, triangulate, transform and assemble (the last two per frame),
+			 and the memory of the mesh against its former float64 + lists of faces form (see Mesh.memory_report)
+	'''
+	def parse():
+		with open(path) as file:
+			return obj_files_handler.extract_data(file)
+
+	results = {'parse': measure(parse, repeats)}
+	mesh = parse()
+
+	geometry = Geometry(*CANVAS_SIZE, threads=threads, lod_targets=()) # Keep the background simplification out of the timings
+	results['upload'] = measure(lambda: geometry.upload_object(mesh), repeats)
+	# On a fresh mesh every time, the triangles are kept once built
+	results['triangulate'] = measure(lambda: Mesh(mesh.verticies, mesh.indices, mesh.offsets).triangulate(), repeats)
+
+	transform, assemble = [], []
+	for angles in orientations(sweep):
+		geometry.reset_rotation(*angles)
+		transform.append(measure(geometry.transform_object, repeats))
+		points = geometry.transform_object()
+		assemble.append(measure(lambda: geometry.assemble_faces(points, geometry.visible_faces(points, True, CANVAS_SIZE, 2)), repeats))
+	results['transform'] = float(np.median(transform))
+	results['assemble'] = float(np.median(assemble))
+	results['verticies'], results['faces'] = geometry.counts()
+	memory = mesh.memory_report()
+	results['mesh_mb'], results['lists_mb'] = memory['total']/2**20, memory['legacy']/2**20
+	return results
+
+def thread_scaling(verticies_count: int, repeats: int, sweep: int) -> dict:
+	'''
+	@brief: Time the projection of a random cloud of points on 1, 2, 4, ... threads (up to all of them)
+	@return: Median transform duration in ms by number of threads
+	'''
+	verticies = np.random.default_rng(0).uniform(-1, 1, (verticies_count, 3))
+	geometry = Geometry(*CANVAS_SIZE, lod_targets=())
+	geometry.upload_object(Mesh(verticies, np.arange(3), np.array((0, 3))))
+	counts = sorted({2**i for i in range(int(math.log2(max_threads())) + 1)} | {max_threads()})
+	results = {}
+	for threads in counts:
+		geometry.set_threads(threads)
+		durations = []
+		for angles in orientations(sweep):
+			geometry.reset_rotation(*angles)
+			durations.append(measure(geometry.transform_object, repeats))
+		results[threads] = float(np.median(durations))
+	return results
+
+def compare(results: dict, baseline: dict, tolerance: float, floor: float = NOISE_FLOOR_MS) -> 'list(str)':
+	'''
+	@brief: Describe every timing that got slower than the baseline by more than the tolerance
+	@param floor: Slowdowns of less than that many ms are ignored, whatever the tolerance
+	'''
+	regressions = []
+	for model, timings in results['models'].items():
+		reference = baseline.get('models', {}).get(model)
+		if reference is None:
+			continue
+		for metric, value in timings.items():
+			if metric in SIZES or metric not in reference:
+				continue
+			if value > reference[metric]*(1 + tolerance) and value - reference[metric] > floor:
+				regressions.append(f"{model:<20}{metric:<10}{reference[metric]:10.3f}ms -> {value:10.3f}ms ({value/reference[metric] - 1:+.0%})")
+	return regressions
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Headless benchmark of the rendering pipeline')
+	parser.add_argument('models', nargs='*', help='.obj files to benchmark (default: Objects/*.obj)')
+	parser.add_argument('--repeats', type=int, default=5, help='Runs of every measure, the median is kept (default: %(default)s)')
+	parser.add_argument('--sweep', type=int, default=12, help='Number of orientations the frame stages are timed at (default: %(default)s)')
+	parser.add_argument('--output', default='bench_results.json', help='Where to write the results (default: %(default)s)')
+	parser.add_argument('--baseline', help='Results to compare against, regressions make the run fail')
+	parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown against the baseline (default: %(default)s)')
+	parser.add_argument('--floor', type=float, default=NOISE_FLOOR_MS, help='Slowdowns under that many ms are never regressions (default: %(default)s)')
+	parser.add_argument('--save-baseline', help='Also write the results there, as the future reference')
+	parser.add_argument('--threads', type=int, help='Threads of the projection of large meshes (default: $VIZ_THREADS, else all)')
+	parser.add_argument('--scaling', type=int, nargs='?', const=1000000, metavar='VERTICIES', help='Also time the projection of that many verticies on 1, 2, 4, ... threads (default: 1000000)')
+	args = parser.parse_args()
+
+	paths = args.models or sorted(glob.glob(os.path.join(OBJECTS_DIR, '*.obj')))
+	results = {
+		'meta': {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(), 'repeats': args.repeats, 'sweep': args.sweep},
+		'models': {},
+	}
+	print(f"{'model':<20}{'verts':>8}{'faces':>8}{'parse':>10}{'upload':>10}{'triangulate':>12}{'transform':>11}{'assemble':>10}  (ms){'mesh':>8}{'lists':>8}  (MB)")
+	for path in paths:
+		name = os.path.basename(path)
+		timings = bench_model(path, args.repeats, args.sweep, args.threads)
+		results['models'][name] = timings
+		print(f"{name:<20}{timings['verticies']:>8}{timings['faces']:>8}{timings['parse']:>10.3f}{timings['upload']:>10.3f}{timings['triangulate']:>12.3f}{timings['transform']:>11.3f}{timings['assemble']:>10.3f}      {timings['mesh_mb']:>8.2f}{timings['lists_mb']:>8.2f}")
+
+	if args.scaling:
+		scaling = thread_scaling(args.scaling, args.repeats, args.sweep)
+		results['scaling'] = {'verticies': args.scaling, 'transform': scaling}
+		print(f"\n{'threads':<10}{'transform':>11}{'speedup':>10}  ({args.scaling} verticies, ms)")
+		for threads, duration in scaling.items():
+			print(f"{threads:<10}{duration:>11.3f}{scaling[1]/duration:>9.2f}x")
+
+	for path in filter(None, (args.output, args.save_baseline)):
+		with open(path, 'w') as file:
+			json.dump(results, file, indent=2)
+
+	if args.baseline:
+		with open(args.baseline) as file:
+			regressions = compare(results, json.load(file), args.tolerance, args.floor)
+		if regressions:
+			print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%} against {args.baseline}:")
+			print('\n'.join(regressions))
+			return 1
+		print(f"\nNo regression beyond {args.tolerance:.0%} against {args.baseline}")
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -1,7 +1,20 @@
-from timer import time_me
+from timer import profiler
+from mesh import Mesh, fan_triangulate
+import lod
+import os
 import math
+import threading
+import warnings
 import numpy as np
 import numba
+import typing
+import functools
+
+if typing.TYPE_CHECKING:
+	from scene import Scene
+
+_project_lock = threading.Lock()
+_threads_started = False
 
 @numba.njit(nogil=True, cache=True, fastmath=True)
 def matmul(A: np.ndarray, B: np.ndarray) -> np.ndarray:
@@ -42,47 +55,534 @@ def min_3d_array(arr: np.ndarray, axis: int) -> float:
 			min_ = i[axis] 
 	return min_
 
+@numba.njit(nogil=True, cache=True)
+def chain_edges(edges: np.ndarray, verticies_count: int) -> 'tuple(np.ndarray, np.ndarray)':
+	'''
+	@brief: Chain the edges of a mesh into polylines (walking from edge to edge until stuck),
+			so that they can be drawn with far less line items than edges
+	@param edges: (E, 2) unique edges (pairs of vertex indices)
+	@param verticies_count: Number of verticies the edges index into
+	@return indices, sizes: The verticies of all the polylines back to back, and the size of each one
+	'''
+	# Adjacency lists (every edge appears in the lists of both its ends)
+	degree = np.zeros(verticies_count + 1, dtype=np.int64)
+	for e in range(edges.shape[0]):
+		degree[edges[e, 0] + 1] += 1
+		degree[edges[e, 1] + 1] += 1
+	starts = np.cumsum(degree)
+	fill = starts[:-1].copy()
+	neighbour_edge = np.empty(2*edges.shape[0], dtype=np.int64)
+	for e in range(edges.shape[0]):
+		for end in range(2):
+			v = edges[e, end]
+			neighbour_edge[fill[v]] = e
+			fill[v] += 1
+
+	used = np.zeros(edges.shape[0], dtype=np.bool_)
+	cursor = starts[:-1].copy() # First adjacency entry of each vertex that might still be unused
+	indices = np.empty(3*edges.shape[0], dtype=np.int64)
+	sizes = np.empty(edges.shape[0], dtype=np.int64)
+	count, strips = 0, 0
+	# Starting from odd-degree verticies first gives longer polylines
+	for odd_pass in (True, False):
+		for first in range(verticies_count):
+			if odd_pass and (starts[first + 1] - starts[first])%2 == 0:
+				continue
+			while True:
+				v = first
+				length = 0
+				while True:
+					while cursor[v] < starts[v + 1] and used[neighbour_edge[cursor[v]]]:
+						cursor[v] += 1
+					if cursor[v] == starts[v + 1]:
+						break
+					e = neighbour_edge[cursor[v]]
+					used[e] = True
+					if length == 0:
+						indices[count] = v
+						count += 1
+						length = 1
+					v = edges[e, 1] if edges[e, 0] == v else edges[e, 0]
+					indices[count] = v
+					count += 1
+					length += 1
+				if length == 0:
+					break
+				sizes[strips] = length
+				strips += 1
+	return indices[:count], sizes[:strips]
+
+@numba.njit(nogil=True, cache=True, parallel=True)
+def project(verticies: np.ndarray,
+			rotation: np.ndarray,
+			zoom: float,
+			obj_scale: float,
+			x0: int,
+			y0: int,
+			rotated: np.ndarray,
+			projected: np.ndarray
+) -> None:
+	'''
+	@brief: Rotate and project the verticies, split in chunks across the numba threads
+	@param rotation: Composed 3x3 rotation matrix
+	@param x0, y0: Object position on the canvas
+	@param rotated: (N, 3) output, the rotated verticies
+	@param projected: (N, 2) int64 output, the 2D projections (truncated towards zero, like __transform_point)
+	'''
+	for i in numba.prange(verticies.shape[0]):
+		x, y, z = verticies[i, 0], verticies[i, 1], verticies[i, 2]
+		rx = rotation[0, 0]*x + rotation[0, 1]*y + rotation[0, 2]*z
+		ry = rotation[1, 0]*x + rotation[1, 1]*y + rotation[1, 2]*z
+		rz = rotation[2, 0]*x + rotation[2, 1]*y + rotation[2, 2]*z
+		rotated[i, 0] = rx
+		rotated[i, 1] = ry
+		rotated[i, 2] = rz
+		w = 0.5 / (zoom - rz)
+		projected[i, 0] = int(rx * w * obj_scale) + x0
+		projected[i, 1] = -int(ry * w * obj_scale) + y0
+
+def rotation_matrices(x: float, y: float, z: float) -> 'tuple(np.array, np.array, np.array)':
+	'''Rotation matrices on the X, Y, and Z axis for these angles (composed as Z @ X @ Y)'''
+	rotation_x = np.array(
+		(
+			(1,      0     ,       0     ),
+			(0, math.cos(x), -math.sin(x)),
+			(0, math.sin(x),  math.cos(x))
+		)
+	)
+
+	rotation_y = np.array(
+		(
+			(math.cos(y), 0, -math.sin(y)),
+			(     0     , 1,       0     ),
+			(math.sin(y), 0,  math.cos(y))
+		)
+	)
+
+	rotation_z = np.array(
+		(
+			(math.cos(z), -math.sin(z), 0),
+			(math.sin(z),  math.cos(z), 0),
+			(     0     ,       0     , 1)
+		)
+	)
+	return rotation_x, rotation_y, rotation_z
+
+def euler_angles(rotation: np.ndarray) -> 'tuple(float, float, float)':
+	'''
+	@brief: Angles (x, y, z) of a rotation matrix, the inverse of rotation_matrices (composed as Z @ X @ Y)
+	@return: x within [-pi/2, pi/2], y and z within [-pi, pi]
+	'''
+	# The Z rotation leaves the last row of X @ Y as it is: (cos(x)sin(y), sin(x), cos(x)cos(y))
+	x = math.asin(max(-1.0, min(1.0, rotation[2, 1])))
+	if abs(rotation[2, 1]) < 1 - 1e-9:
+		y = math.atan2(rotation[2, 0], rotation[2, 2])
+		z = math.atan2(-rotation[0, 1], rotation[1, 1])
+	else:
+		# Gimbal lock, Y and Z turn around the same axis: Z takes it all
+		y = 0.0
+		z = math.atan2(rotation[1, 0], rotation[0, 0])
+	return x, y, z
+
+def axis_rotation(axis: np.ndarray, angle: float) -> np.ndarray:
+	'''3x3 matrix of the rotation by angle around a unit axis (Rodrigues' formula)'''
+	x, y, z = axis
+	cross = np.array(((0, -z, y), (z, 0, -x), (-y, x, 0)))
+	return np.eye(3) + math.sin(angle)*cross + (1 - math.cos(angle))*(cross @ cross)
+
+def project_orientation(verticies: np.ndarray,
+						zoom: float,
+						obj_scale: float,
+						position: 'tuple(int, int)',
+						threads: int,
+						x: float,
+						y: float,
+						z: float
+) -> 'tuple(np.ndarray, np.ndarray)':
+	'''
+	@brief: Rotate the verticies to an orientation and project them (see project)
+	@param threads: Numba threads the kernel is split across
+	@return projected, rotated: (N, 2) int64 projections, and the (N, 3) rotated verticies
+	'''
+	rot_x, rot_y, rot_z = rotation_matrices(x, y, z)
+	rotated = np.empty(verticies.shape, dtype=np.float64)
+	projected = np.empty((len(verticies), 2), dtype=np.int64)
+	# Launches of the parallel kernel from several threads at once aren't safe with every numba threading layer
+	with _project_lock:
+		numba.set_num_threads(threads)
+		project(verticies, rot_z @ rot_x @ rot_y, float(zoom), float(obj_scale), int(position[0]), int(position[1]), rotated, projected)
+	return projected, rotated
+
+def start_threads() -> None:
+	'''
+	Start the numba threads with a tiny projection, from the calling thread. Call it on the main thread before
+	projecting on another one: with the TBB threading layer, threads first started from a secondary thread
+	hang the interpreter on exit
+	'''
+	global _threads_started
+	if not _threads_started:
+		project_orientation(np.zeros((1, 3), dtype=np.float32), 50.0, 1.0, (0, 0), 1, 0.0, 0.0, 0.0)
+		_threads_started = True
+
+def max_threads() -> int:
+	'''Threads numba was started with (set $NUMBA_NUM_THREADS to change it)'''
+	return numba.config.NUMBA_NUM_THREADS
+
+def default_threads() -> int:
+	'''Threads of the projection kernel: $VIZ_THREADS if set (to an integer), else all the ones numba can use'''
+	value = os.environ.get('VIZ_THREADS')
+	if not value:
+		return max_threads()
+	try:
+		return int(value)
+	except ValueError:
+		warnings.warn(f"VIZ_THREADS={value!r} is not an integer, using all the {max_threads()} threads", RuntimeWarning, stacklevel=2)
+		return max_threads()
+
 class Geometry:
 	'''
 	Geometry handling class (linear algebra)
 	'''
 	OBJECT_SCALE = 2000 # Maybe make this dynamic depending on the object size
+	LOD_TARGETS = (20000, 5000) # Default maximum number of faces of each simplified level of detail, finest first
+	PARALLEL_MIN_VERTICIES = 50000 # Below that, waking the threads up costs more than the parallel projection saves
 	
-	def __init__(self, canvas_width: int, canvas_height: int) -> None:
+	def __init__(self, canvas_width: int, canvas_height: int, batched: bool = True, threads: int = None, lod_targets: 'tuple(int)' = None) -> None:
 		'''
+		@param canvas_width: Width of the drawing canvas
+		@param canvas_height: Height of the drawing canvas
+		@param batched: Project the whole vertex array at once instead of point by point
+		@param threads: Threads of the batched projection of large meshes, see default_threads() for the default
+		@param lod_targets: Maximum number of faces of each simplified level, LOD_TARGETS by default, () for none
 		'''
+		self._batched = batched
+		self._lod_targets = self.LOD_TARGETS if lod_targets is None else tuple(lod_targets)
+		self.set_threads(threads or default_threads())
 		self._obj_position = np.array((canvas_width//2, canvas_height//2))
+		self._obj_scale = self.OBJECT_SCALE
 		self._zoom = 50.0
 		self._angle_x = 0.0
 		self._angle_y = 0.0
 		self._angle_z = 0.0
-		self._faces = None
+		self._mesh = None # Mesh of the current level of detail
 		self._verticies = None
+		self._face_indices = None
+		self._face_sizes = None
+		self._face_starts = None
+		self._face_corners = None
+		self._rotated = None # Rotated verticies of the last batched transform
+		self._cull_stats = {}
+		self._levels = [] # (mesh, sizes, starts, corners) of every level of detail, the full one first
+		self._level = 0
+		self._wireframes = {} # Unique edges and their polylines of every level, computed on first use
 
-	def upload_object(self, verts: np.ndarray, faces: list) -> None:
-		'''Uploads the verticies and faces to manipulate'''
-		self._verticies = self.__normalize_3d_array(verts, axis=0)
-		self._faces = faces
+	@profiler.timed('upload')
+	def upload_object(self, mesh: Mesh, bounds: 'tuple(np.ndarray, np.ndarray)' = None, normalize: bool = True) -> None:
+		'''
+		@brief: Uploads the mesh to manipulate (its verticies are normalized on a copy)
+		@param bounds: (min, max) corners the verticies are normalized from, the mesh's own by default
+		@param normalize: False for a mesh that is already normalized (see mesh()), it's then used as is
+		'''
+		verticies = self.__normalize_3d_array(mesh.verticies.copy(), axis=0, bounds=bounds) if normalize else mesh.verticies
+		self._levels = [self.__level(mesh.with_verticies(verticies))]
+		self._wireframes = {}
+		self._level = -1
+		self.set_level(0)
+
+		# The simplified levels are built in the background, and become usable as they get appended
+		if any(target < self._mesh.face_count for target in self._lod_targets):
+			threading.Thread(target=self.__build_levels, args=(self._levels, self._mesh), daemon=True).start()
+
+	def upload_scene(self, scene: 'Scene') -> np.ndarray:
+		'''
+		@brief: Uploads the visible instances of a scene, packed into a single mesh (see Scene.pack) so that
+				the whole scene is projected in one pass. It's normalized over the whole scene, hidden
+				instances included, so that showing or hiding some doesn't move the others
+		@return face_instances: The instance every face of the full level comes from
+		'''
+		mesh, face_instances = scene.pack()
+		self.upload_object(mesh, scene.bounds())
+		return face_instances
+
+	def set_level(self, level: int) -> bool:
+		'''
+		@brief: Switch to another level of detail (0 is the full mesh, the higher the coarser)
+		@Note: Falls back to the coarsest level available if the requested one isn't built (yet)
+		@return changed: Whether the mesh to draw changed
+		'''
+		level = min(level, len(self._levels) - 1)
+		if level == self._level:
+			return False
+		self._level = level
+		self._mesh, self._face_sizes, self._face_starts, self._face_corners = self._levels[level]
+		self._verticies, self._face_indices = self._mesh.verticies, self._mesh.indices
+		self._rotated = None
+		return True
+
+	@property
+	def level(self) -> int:
+		'''Current level of detail (0 is the full mesh)'''
+		return self._level
+
+	@property
+	def levels_count(self) -> int:
+		'''Number of levels of detail built so far (including the full mesh)'''
+		return len(self._levels)
+
+	def counts(self, level: int = None) -> 'tuple(int, int)':
+		'''(verticies, faces) counts of a level of detail, the current one by default'''
+		mesh = self.mesh(self._level if level is None else level)
+		return mesh.vertex_count, mesh.face_count
+
+	def mesh(self, level: int = 0) -> Mesh:
+		'''
+		@brief: Mesh of a level of detail with its normalized verticies, the full mesh by default
+		@Note: Upload it with normalize=False to get the same view back: normalizing it again would use its own bounds,
+			   which aren't the scene's when some instances are hidden (see upload_scene)
+		'''
+		return self._levels[level][0]
+
+	@staticmethod
+	def __level(mesh: Mesh) -> 'tuple(Mesh, np.ndarray, np.ndarray, np.ndarray)':
+		'''
+		@brief: Per-face arrays of a level, for the vectorized per-face work
+		@return: (mesh, size of each face, start of each face,
+				  (F, 3) first 3 corners of each face, which give its orientation)
+		'''
+		sizes, starts, indices = mesh.sizes, mesh.starts, mesh.indices
+		if mesh.fixed is not None and mesh.fixed.shape[1] >= 3:
+			# Triangles, quads...: the first corners are a plain slice
+			corners = mesh.fixed[:, :3]
+		elif mesh.face_count:
+			# Faces with less than 3 corners repeat their last one
+			corners = indices[np.minimum(starts[:, None] + np.arange(3), starts[:, None] + sizes[:, None] - 1)]
+		else:
+			corners = np.empty((0, 3), dtype=np.int32)
+		return mesh, sizes, starts, corners
+
+	def __build_levels(self, levels: list, mesh: Mesh) -> None:
+		'''Worker thread body: append the simplified levels to the given list, finest first'''
+		triangles = mesh.triangles if mesh.triangulated else fan_triangulate(mesh.indices, mesh.offsets)[0]
+		for level_verticies, level_triangles in lod.build_levels(mesh.verticies, triangles, mesh.face_count, self._lod_targets):
+			level = Mesh(level_verticies, level_triangles.ravel(), np.arange(len(level_triangles) + 1)*3)
+			# Already triangles, triangulating them only adds views
+			levels.append(self.__level(level.triangulate() if mesh.triangulated else level))
 
 	def update_position(self, x: int, y: int) -> None:
 		'''Update x, y position of the object'''
 		self._obj_position[0] += x
 		self._obj_position[1] += y
+
+	def set_position(self, x: int, y: int) -> None:
+		'''Place the object at x, y (in canvas pixels)'''
+		self._obj_position[0] = x
+		self._obj_position[1] = y
+
+	@property
+	def position(self) -> 'tuple(int, int)':
+		'''x, y position of the object in canvas pixels'''
+		return int(self._obj_position[0]), int(self._obj_position[1])
+
+	def set_object_scale(self, scale: float) -> None:
+		'''Set the size of the object on screen (pixels per projected unit, OBJECT_SCALE by default)'''
+		self._obj_scale = scale
+
+	@property
+	def object_scale(self) -> float:
+		return self._obj_scale
 	
-	@time_me
-	def transform_object(self) -> 'list(list(int, int))':
-		'''Retur the points of the object transformed according to the current pose'''
+	@profiler.timed('transform')
+	def transform_object(self) -> np.ndarray:
+		'''Return the (N, 2) points of the object transformed according to the current pose'''
+		if self._batched:
+			return self.__transform_batch()
+		self._rotated = None
 		rot_x, rot_y, rot_z = self.__calculate_rot_matrix()
 		projected_points = []
 		for pt in self._verticies:
-			x, y = self.__transform_point(pt, rot_x, rot_y, rot_z, self._zoom, self._obj_position, self.OBJECT_SCALE)
+			x, y = self.__transform_point(pt, rot_x, rot_y, rot_z, self._zoom, self._obj_position, self._obj_scale)
 			projected_points.append([x, y])
-		return projected_points
+		return np.array(projected_points, dtype=np.int64).reshape((-1, 2))
+
+	@property
+	def batched(self) -> bool:
+		'''Whether the whole-mesh (batched) transform is used'''
+		return self._batched
+
+	def set_batched(self, batched: bool) -> None:
+		'''Switch between the batched and the per-point transform'''
+		self._batched = batched
+
+	@property
+	def threads(self) -> int:
+		'''Threads the batched projection of large meshes is split across'''
+		return self._threads
+
+	def set_threads(self, threads: int) -> None:
+		'''Set the threads of the batched projection, clamped to what numba was started with'''
+		self._threads = max(1, min(int(threads), max_threads()))
+
+	def assemble_faces(self, points: np.ndarray, face_ids: np.ndarray = None) -> 'list(list(int))':
+		'''
+		@brief: Gather the projected points of each face, ready to be handed to the canvas
+		@param points: (N, 2) projected points, as returned by transform_object
+		@param face_ids: Indices of the faces to assemble, all of them if None
+		@return coords: One flat [x0, y0, x1, y1, ...] list per face
+		'''
+		if face_ids is None:
+			indices, sizes = self._face_indices, self._face_sizes
+		else:
+			sizes = self._face_sizes[face_ids]
+			firsts = np.cumsum(sizes) - sizes
+			# Position of every corner within its face, added to where that face starts in the flat indices
+			corner = np.arange(int(sizes.sum())) - np.repeat(firsts, sizes)
+			indices = self._face_indices[np.repeat(self._face_starts[face_ids], sizes) + corner]
+
+		return self.__assemble(points, indices, sizes)
+
+	def assemble_edges(self, points: np.ndarray) -> 'list(list(int))':
+		'''
+		@brief: Gather the projected points of the wireframe polylines (each edge of the mesh appears once)
+		@param points: (N, 2) projected points, as returned by transform_object
+		@return coords: One flat [x0, y0, x1, y1, ...] list per polyline
+		'''
+		_, indices, sizes = self.wireframe
+		return self.__assemble(points, indices, sizes)
+
+	@property
+	def wireframe(self) -> 'tuple(np.ndarray, np.ndarray, np.ndarray)':
+		'''
+		Unique edges of the current level: ((E, 2) edges, then the same edges chained into
+		polylines: verticies of all the polylines back to back, size of each polyline)
+		'''
+		if self._level not in self._wireframes:
+			edges = self.__unique_edges()
+			self._wireframes[self._level] = (edges,) + chain_edges(edges, len(self._verticies))
+		return self._wireframes[self._level]
+
+	def __unique_edges(self) -> np.ndarray:
+		'''Every edge shared by the faces, once, as (E, 2) sorted pairs of vertex indices'''
+		# Each corner connects to the next one of its face, the last corner back to the first
+		following = np.arange(1, len(self._face_indices) + 1)
+		following[self._face_starts + self._face_sizes - 1] = self._face_starts
+		pairs = np.sort(np.stack((self._face_indices, self._face_indices[following]), axis=1), axis=1)
+		pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+		# Deduplicate the pairs as single integers, much faster than unique rows (int64, the int32 indices would overflow)
+		count = len(self._verticies)
+		keys = np.unique(pairs[:, 0].astype(np.int64)*count + pairs[:, 1])
+		return np.stack((keys//count, keys%count), axis=1)
+
+	@staticmethod
+	def __assemble(points: np.ndarray, indices: np.ndarray, sizes: np.ndarray) -> 'list(list(int))':
+		'''Gather the points of consecutive index runs into flat [x0, y0, x1, y1, ...] lists'''
+		# One conversion to Python numbers for all the runs, then cheap list slicing
+		flat = points[indices].ravel().tolist()
+		ends = (2*np.cumsum(sizes)).tolist()
+		return [flat[end - 2*size:end] for end, size in zip(ends, sizes.tolist())]
+
+	@profiler.timed('cull')
+	def visible_faces(self,
+					  points: np.ndarray = None,
+					  cull_back_faces: bool = True,
+					  viewport: 'tuple(int, int)' = None,
+					  min_area: float = 0.0
+	) -> np.ndarray:
+		'''
+		@brief: Select the faces to draw for the last transformed pose
+		@param points: (N, 2) projected points of the last transform, needed by the screen-space stages
+		@param cull_back_faces: Drop the faces turned away from the viewer
+		@param viewport: (width, height) of the canvas, drop the faces that lie completely outside of it
+		@param min_area: Drop the faces whose bounding box covers less pixels than this
+		@return face_ids: Indices of the faces to draw, in drawing order
+		'''
+		keep = np.ones(self._mesh.face_count, dtype=bool)
+		self._cull_stats = {'back': 0, 'offscreen': 0, 'subpixel': 0}
+		if cull_back_faces:
+			keep &= self.__front_facing()
+			self._cull_stats['back'] = int(len(keep) - np.count_nonzero(keep))
+
+		if points is not None and (viewport is not None or min_area > 0) and len(keep):
+			x_min, y_min, x_max, y_max = self.__face_bounds(points)
+			if viewport is not None:
+				onscreen = (x_max >= 0) & (y_max >= 0) & (x_min <= viewport[0]) & (y_min <= viewport[1])
+				self._cull_stats['offscreen'] = int(np.count_nonzero(keep & ~onscreen))
+				keep &= onscreen
+			if min_area > 0:
+				# Pixels touched by the bounding box, a face that collapsed into a single pixel covers 1
+				large = (x_max - x_min + 1)*(y_max - y_min + 1) >= min_area
+				self._cull_stats['subpixel'] = int(np.count_nonzero(keep & ~large))
+				keep &= large
+		return np.flatnonzero(keep)
+
+	@property
+	def cull_stats(self) -> dict:
+		'''Number of faces dropped by each culling stage of the last visible_faces() call'''
+		return self._cull_stats
+
+	@property
+	def culled_count(self) -> int:
+		'''Total number of faces dropped by the last visible_faces() call'''
+		return sum(self._cull_stats.values())
+
+	def __face_bounds(self, points: np.ndarray) -> 'tuple(np.ndarray, np.ndarray, np.ndarray, np.ndarray)':
+		'''Screen-space bounding box (x_min, y_min, x_max, y_max) of every face'''
+		corners = points[self._face_indices]
+		# Empty faces would break reduceat, give them the bounds of their neighbour's first corner
+		starts = np.minimum(self._face_starts, len(corners) - 1)
+		x_min = np.minimum.reduceat(corners[:, 0], starts)
+		y_min = np.minimum.reduceat(corners[:, 1], starts)
+		x_max = np.maximum.reduceat(corners[:, 0], starts)
+		y_max = np.maximum.reduceat(corners[:, 1], starts)
+		return x_min, y_min, x_max, y_max
+
+	def __front_facing(self) -> np.ndarray:
+		'''
+		@brief: Find which faces look towards the viewer, using the rotated verticies
+		@Note: The viewer sits at (0, 0, zoom) looking down the Z axis (see __transform_point), and
+			   faces are expected to be counter-clockwise when seen from the front, as in .obj files.
+			   The normal of a triangulated polygon sums the ones of its triangles, which stays right
+			   for concave polygons, otherwise it comes from the first 3 corners
+		@return front: Boolean mask over the faces
+		'''
+		a, b, c = (self.rotated[self._face_corners[:, i]] for i in range(3))
+		triangles, fixed = self._mesh.triangles, self._mesh.fixed
+		if triangles is None or (fixed is not None and fixed.shape[1] <= 3):
+			# Not triangulated, or only triangles: the first 3 corners are the whole story
+			normals = np.cross(b - a, c - a)
+		else:
+			ta, tb, tc = (self.rotated[triangles[:, i]] for i in range(3))
+			crosses = np.cross(tb - ta, tc - ta)
+			faces, count = self._mesh.triangle_faces, len(a)
+			normals = np.stack([np.bincount(faces, weights=crosses[:, axis], minlength=count) for axis in range(3)], axis=1)
+		to_viewer = np.array((0.0, 0.0, self._zoom)) - a
+		front = np.einsum('ij,ij->i', normals, to_viewer) > 0
+		# Points and lines have no orientation, never cull them
+		return front | (self._face_sizes < 3)
+
+	@property
+	def rotated(self) -> np.ndarray:
+		'''(N, 3) verticies rotated to the current pose (before the projection), Z grows towards the viewer'''
+		if self._rotated is None:
+			rot_x, rot_y, rot_z = self.__calculate_rot_matrix()
+			self._rotated = self._verticies @ (rot_z @ rot_x @ rot_y).T
+		return self._rotated
+
+	@property
+	def triangles(self) -> 'tuple(np.ndarray, np.ndarray)':
+		'''(T, 3) triangles of the current level and the first triangle of every face, None if the mesh wasn't triangulated'''
+		if not self._mesh.triangulated:
+			return None
+		return self._mesh.triangles, self._mesh.triangle_offsets
+
+	@property
+	def face_layout(self) -> 'tuple(np.ndarray, np.ndarray, np.ndarray)':
+		'''Flat layout of the faces: (indices of all the faces back to back, start of each face, size of each face)'''
+		return self._face_indices, self._face_starts, self._face_sizes
 
 	@property
 	def faces(self) -> list:
-		'''Get the faces formed between the points'''
-		return self._faces
+		'''Get the faces formed between the points, as lists (built on every call, see face_layout for the arrays)'''
+		return self._mesh.to_lists()
 
 	@property
 	def zoom(self) -> int:
@@ -122,21 +622,26 @@ class Geometry:
 	@numba.njit(nogil=True, cache=True, fastmath=True)
 	def __normalize_3d_array(arr: np.ndarray, 
 							 range: 'tuple(float, float)' = (-1, 1),
-							 axis: int = 2
+							 axis: int = 2,
+							 bounds: 'tuple(np.ndarray, np.ndarray)' = None
 	) -> np.ndarray:
 		'''
 		@brief: Normalize an array values within a range based on a specified axis
 		@param arr: The array to be normalized
 		@param range: Normalized values range (min, max)
 		@param axis: the axis to normalize based on
+		@param bounds: (min, max) corners to normalize from instead of the array's own
 		@return arr: The normalized array
 		'''
-		mnx = min_3d_array(arr, 0)
-		mxx = max_3d_array(arr, 0)
-		mnz = min_3d_array(arr, 2)
-		mxz = max_3d_array(arr, 2)
-		mny = min_3d_array(arr, 1)
-		mxy = max_3d_array(arr, 1)
+		if bounds is None:
+			mnx = min_3d_array(arr, 0)
+			mxx = max_3d_array(arr, 0)
+			mnz = min_3d_array(arr, 2)
+			mxz = max_3d_array(arr, 2)
+			mny = min_3d_array(arr, 1)
+			mxy = max_3d_array(arr, 1)
+		else:
+			(mnx, mny, mnz), (mxx, mxy, mxz) = bounds
 
 		if axis == 0:
 			diff = mxx - mnx
@@ -189,35 +694,42 @@ class Geometry:
 
 		return x, y
 
+	def __transform_batch(self) -> np.ndarray:
+		'''
+		@brief: Project all the verticies in one pass
+		@Note: The rotations are composed once per frame (in the same Y, X, Z order
+			   as __transform_point), so each vertex costs a single 3x3 product.
+			   Large meshes are split across the threads set with set_threads
+		@return projected: Contiguous (N, 2) array of the 2D projections
+		'''
+		projected, self._rotated = self.projector()(*self.orientation)
+		return projected
+
+	def projector(self) -> 'functools.partial':
+		'''
+		@brief: The batched projection of the current level at the current zoom, position and scale, as a function
+				of the orientation alone: projector(x, y, z) -> (projected, rotated).
+				It keeps what it captured whatever happens to the geometry afterwards, so it can run on another
+				thread (see playback.PlaybackBuffer)
+		'''
+		# Small meshes stay on one thread, waking the others up would cost more than it saves
+		threads = self._threads if len(self._verticies) >= self.PARALLEL_MIN_VERTICIES else 1
+		return functools.partial(project_orientation, self._verticies, self._zoom, self._obj_scale, self.position, threads)
+
+	def set_projected_pose(self, orientation: 'tuple(float, float, float)', rotated: np.ndarray = None) -> None:
+		'''
+		@brief: Take the orientation of a frame projected by a projector(), instead of calling transform_object()
+		@param rotated: Its rotated verticies, for the back-face culling (computed again when needed if None)
+		'''
+		self.reset_rotation(*orientation)
+		self._rotated = rotated
+
 	def __calculate_rot_matrix(self) -> 'tuple(np.array, np.array, np.array)':
 		'''
 		Calculate the rotation matrices on X, Y, and Z axis 
 		that correspond to the current requested rotation
 		'''
-		rotation_x = np.array(
-			(
-				(1,               0        ,               0         ),
-				(0, math.cos(self._angle_x), -math.sin(self._angle_x)),
-				(0, math.sin(self._angle_x),  math.cos(self._angle_x))
-			)
-		)
-
-		rotation_y = np.array(
-			(
-				(math.cos(self._angle_y), 0, -math.sin(self._angle_y)),
-				(            0          , 1,             0           ),
-		        (math.sin(self._angle_y), 0,  math.cos(self._angle_y))
-			)
-		)
-
-		rotation_z = np.array(
-			(
-				(math.cos(self._angle_z), -math.sin(self._angle_z), 0),
-				(math.sin(self._angle_z),  math.cos(self._angle_z), 0),
-			 	(           0           ,              0          , 1)
-			)
-		)
-		return rotation_x, rotation_y, rotation_z
+		return rotation_matrices(self._angle_x, self._angle_y, self._angle_z)
 
 
 if __name__ == '__main__':
@@ -1,11 +1,21 @@
-import obj_files_handler as obj_files_handler 
-from geometry import Geometry
-from timer import time_me
+from geometry import Geometry, max_threads, rotation_matrices, euler_angles, axis_rotation
+from mesh_cache import MeshCache
+from model_loader import ModelLoader
+from playback import PlaybackBuffer
+from picking import PickIndex
+from rasterizer import Rasterizer
+from scene import Scene
+from scheduler import FrameScheduler
+from timer import profiler
+import offscreen
+import turntable
 
 import math
+import time
+import threading
+import numpy as np
 import tkinter as tk
-from tkinter import ttk, filedialog, colorchooser, messagebox
-import pyscreenshot as ImageGrab
+from tkinter import ttk, filedialog, colorchooser, messagebox, simpledialog
 
 import sv_ttk
 
@@ -19,19 +29,84 @@ class GUI(tk.Tk):
 	CANVAS_COLOR = 'white'
 	COMMON_X = 0.98	# Many graphical elements share the same relative X position
 	MOVING_STEP = 10
+	TARGET_FPS = 60 # Redraws are capped to that many frames per second
+	LOADER_POLL_MS = 50 # How often the background loading progress is checked
+	# Retained: polygons are created once then moved, Immediate: redrawn every frame, Raster: one software-rendered image
+	RENDER_MODES = ('Retained', 'Immediate', 'Raster')
+	FACE_TAG = 'face'
+	LOD_LEVEL = 1 # Level of detail drawn while the pose is changing (see Geometry.LOD_TARGETS)
+	LOD_IDLE_MS = 300 # The full mesh is drawn back once the pose stopped changing for that long
+	HUD_INTERVAL_MS = 500 # The HUD text is refreshed at this rate, not on every frame
+	HUD_COLOR = '#E0A000'
+	HOVER_COLOR = '#FF8000' # Outline of the face under the mouse
+	SELECT_COLOR = '#FF0080' # Outline of the clicked face
+	CLICK_SLOP = 3 # A left press that moves less pixels than this is a click (selection), not a rotation
+	ARCBALL_RADIUS = 0.5 # Radius of the arcball relative to the smallest side of the canvas
+	TRIANGULATE_ON_LOAD = True # Triangulate the meshes once when loading them, for the raster fill and the culling of n-gons
+	MIN_FACE_AREA = 2 # Faces whose bounding box covers less pixels than this aren't drawn (0 to draw them all)
+	SCREENSHOT_WIDTH = 3840 # Default width of the screenshots, they are rendered offscreen whatever the window size
+	SCREENSHOT_MAX_WIDTH = 16384
+	TURNTABLE_FRAMES = 120 # Default number of frames of an exported turntable
+	TURNTABLE_FPS = 30
+	DUPLICATE_SPACING = 1.1 # Duplicated parts are placed that many part widths away from the original
+	PLAYBACK_FRAMES = 8 # Frames of the continuous rotation projected ahead of time
+	# What a change invalidates: rotations and zoom re-project the object, a translation only shifts
+	# the projected points, the style only recolors the drawn items, the canvas size re-culls them
+	POSE, ZOOM, TRANSLATION, STYLE, CANVAS = 'pose', 'zoom', 'translation', 'style', 'canvas'
+	EVERYTHING = frozenset((POSE, ZOOM, TRANSLATION, STYLE, CANVAS))
+	REPROJECT = frozenset((POSE, ZOOM))
 	
 	POINT_SIZE = 1 
 	POINT_COLOR = '#131313'
 
-	def __init__(self, title='3D_Viz', min_size=(MIN_WIDTH, MIN_HEIGHT)):
+	def __init__(self, title='3D_Viz', min_size=(MIN_WIDTH, MIN_HEIGHT), target_fps=TARGET_FPS):
 		''''''
 		super().__init__()
 		# Set the theme to be dark (there must be an initialized app)
 		sv_ttk.set_theme("dark")
 		
 		self._file_exists = False # A flag for whether the file has been loaded or not
-		self._changed = True # A flag used to only redraw the object when a change occured
+		self._dirty = set(self.EVERYTHING) # What changed since the last frame, the object is only redrawn when something did
+		self._points = None # Projected points of the last frame, shifted in place by translations
+		self._points_position = None # Object position the points are projected at
+		# Frames are only rendered when something changed (or during animations), at most target_fps times a second
+		self._scheduler = FrameScheduler(self, self.render, target_fps)
 		self._geometry_handler = Geometry(self.CANVAS_WIDTH, self.CANVAS_HEIGHT)
+		self._mesh_cache = MeshCache() # Parsed meshes, so that re-opening a model skips the parsing
+		self._loader = ModelLoader(self._mesh_cache)
+		self._playback = PlaybackBuffer(self.PLAYBACK_FRAMES)
+		self._loading_name = ""
+		self._loading_part = False # Whether the file being loaded is added to the scene, rather than replacing it
+		self._scene = Scene() # Parts shown together, packed into a single mesh for the geometry handler
+		self._face_instances = None # Instance of the scene every face of the full level comes from
+		self._parts_window = None
+		self._parts_tree = None
+		self._polling_loader = False
+		self._face_items = None # Canvas polygons of the faces in retained mode (None: to be (re)created)
+		self._items_style = None # (fill, outline) the retained polygons are currently drawn with
+		self._items_shown = None # Which of the retained polygons are currently shown (not culled)
+		self._edge_items = None # Canvas polylines of the wireframe in retained mode (None: to be (re)created)
+		self._last_pose_input = 0.0 # perf_counter() of the last rotation/zoom input
+		self._rasterizer = None
+		self._raster_item = None # Canvas image item of the raster mode
+		self._raster_image = None # Keeps the shown PhotoImage alive
+		self._items_emitted = 0 # Canvas items created or updated one by one by the last frame
+		self._hud_item = None
+		self._hud_text = ""
+		self._hud_last = (0, 0.0) # (drawn frames, perf_counter()) of the last HUD refresh
+		self._hud_refresh = None # after() id of the pending HUD refresh
+		self._profiling_before_hud = profiler.enabled # Restored when the HUD is hidden (VIZ_PROFILE keeps its exit report)
+		self._pick_index = None # Grid over the drawn faces for the mouse picking, built on the first pick after every redraw
+		self._drawn_faces = None # Faces drawn by the last frame (None: all of them)
+		self._hovered = -1 # Face under the mouse
+		self._selected = None # (level, face, description) of the clicked face
+		self._pick_items = {} # Canvas outlines of the hovered and selected faces
+		self._press = None # Where the left button was pressed
+		self._drag_from = None # Pointer position the arcball rotation was last applied at (None: not dragging)
+		self._drag_to = None # Latest pointer position of the drag, applied by the next frame
+		self._pan_from = None # Pointer position of the middle-drag panning
+		self._turntable_thread = None # Background turntable export
+		self._turntable_result = None # (path, error) of the last export, set by its thread
 		
 		# Initial canvas ratios
 		self._canvas_w = int((self.CANVAS_WIDTH/MIN_WIDTH)*MIN_WIDTH)
@@ -47,6 +122,12 @@ class GUI(tk.Tk):
 	def __initialise_window(self, title, min_size):
 		self.title(title)
 		self.minsize(*min_size)
+		self.protocol("WM_DELETE_WINDOW", self.__close)
+
+	def __close(self):
+		# The playback worker might be projecting a frame, let it finish before the interpreter goes down
+		self._playback.close()
+		self.destroy()
 		
 	def __create_widgets(self):
 		self.__create_canvas()
@@ -55,11 +136,21 @@ class GUI(tk.Tk):
 		self.__create_y_rot_slider()
 		self.__create_z_rot_slider()
 		self.__create_reset_rot_button()
+		self.__create_render_mode_selector()
 		self.__create_import_file_button()
 		self.__create_screenshot_button()
+		self.__create_turntable_button()
+		self.__create_parts_button()
+		self.__create_pick_label()
+		self.__create_loading_progress()
 		self.__create_up_down_left_right_buttons()
 		self.__create_color_pickers()
 		self.__create_fill_check()
+		self.__create_cull_check()
+		self.__create_lod_check()
+		self.__create_wireframe_check()
+		self.__create_hud_check()
+		self.__create_threads_spinbox()
 
 	def __create_canvas(self):
 		self._canvas_color = tk.StringVar()
@@ -73,9 +164,18 @@ class GUI(tk.Tk):
 		self._canvas.bind('<Button-4>', self.__mousewheel_scroll_in_canvas_up_event)
 		self._canvas.bind('<Button-5>', self.__mousewheel_scroll_in_canvas_down_event)
 
+		# Face picking (left click), arcball rotation (left drag) and panning (middle drag)
+		self._canvas.bind('<Motion>', self.__hover)
+		self._canvas.bind('<Leave>', self.__unhover)
+		self._canvas.bind('<ButtonPress-1>', self.__press)
+		self._canvas.bind('<B1-Motion>', self.__drag)
+		self._canvas.bind('<ButtonRelease-1>', self.__release)
+		self._canvas.bind('<ButtonPress-2>', self.__pan_start)
+		self._canvas.bind('<B2-Motion>', self.__pan)
+
 	def __create_zoom_slider(self):
 		ttk.Label(self, text="Zoom:").place(relx=self.COMMON_X, rely=0.052, relheight=0.035, relwidth=0.1, anchor="ne")
-		self._zoom_slider = ttk.Scale(self, from_=1000.0, to=1.1, orient="horizontal", command=self.__changed)
+		self._zoom_slider = ttk.Scale(self, from_=1000.0, to=1.1, orient="horizontal", command=self.__zoom_changed)
 		self._zoom_slider.set(self._geometry_handler.zoom)
 		self._zoom_slider.place(relx=self.COMMON_X, rely=0.088, relheight=0.04, relwidth=0.1, anchor="ne")
 
@@ -83,7 +183,7 @@ class GUI(tk.Tk):
 		self._check_x_continuos = tk.BooleanVar()
 		ttk.Checkbutton(self, text="", variable=self._check_x_continuos, command=self.__continuous_x, onvalue=True, offvalue=False).place(relx=self.COMMON_X-0.1, rely=0.121)
 		ttk.Label(self, text="X Rotation:").place(relx=self.COMMON_X, rely=0.123, relheight=0.035, relwidth=0.075, anchor="ne")
-		self.x_rotation_slider = ttk.Scale(self, from_=-math.pi, to=math.pi, orient="horizontal", command=self.__changed)
+		self.x_rotation_slider = ttk.Scale(self, from_=-math.pi, to=math.pi, orient="horizontal", command=self.__pose_changed)
 		self.x_rotation_slider.set(0)
 		self.x_rotation_slider.place(relx=self.COMMON_X, rely=0.163, relheight=0.04, relwidth=0.1, anchor="ne")
 
@@ -91,7 +191,7 @@ class GUI(tk.Tk):
 		self._check_y_continuos = tk.BooleanVar()
 		ttk.Checkbutton(self, text="", variable=self._check_y_continuos, command=self.__continuous_y, onvalue=True, offvalue=False).place(relx=self.COMMON_X-0.1, rely=0.202)
 		ttk.Label(self, text="Y Rotation:").place(relx=self.COMMON_X, rely=0.204, relheight=0.035, relwidth=0.075, anchor="ne")
-		self.y_rotation_slider = ttk.Scale(self, from_=-math.pi, to=math.pi, orient="horizontal", command=self.__changed)
+		self.y_rotation_slider = ttk.Scale(self, from_=-math.pi, to=math.pi, orient="horizontal", command=self.__pose_changed)
 		self.y_rotation_slider.set(0)
 		self.y_rotation_slider.place(relx=self.COMMON_X, rely=0.244, relheight=0.04, relwidth=0.1, anchor="ne")
 
@@ -99,13 +199,35 @@ class GUI(tk.Tk):
 		self._check_z_continuos = tk.BooleanVar()
 		ttk.Checkbutton(self, text="", variable=self._check_z_continuos, command=self.__continuous_z, onvalue=True, offvalue=False).place(relx=self.COMMON_X-0.1, rely=0.283)
 		ttk.Label(self, text="Z Rotation:").place(relx=self.COMMON_X, rely=0.285, relheight=0.035, relwidth=0.075, anchor="ne")
-		self.z_rotation_slider = ttk.Scale(self, from_=-math.pi, to=math.pi, orient="horizontal", command=self.__changed)
+		self.z_rotation_slider = ttk.Scale(self, from_=-math.pi, to=math.pi, orient="horizontal", command=self.__pose_changed)
 		self.z_rotation_slider.set(0)
 		self.z_rotation_slider.place(relx=self.COMMON_X, rely=0.325, relheight=0.04, relwidth=0.1, anchor="ne")
 
 	def __create_reset_rot_button(self):
 		ttk.Button(self, text="Reset rot", command=self.__reset_rotation).place(relx=self.COMMON_X, rely=0.38, relheight=0.05, relwidth=0.095, anchor="ne")
 
+	def __create_render_mode_selector(self):
+		ttk.Label(self, text="Render:").place(relx=self.COMMON_X, rely=0.445, relheight=0.035, relwidth=0.1, anchor="ne")
+		self._render_mode = tk.StringVar()
+		self._render_mode.set(self.RENDER_MODES[0])
+		selector = ttk.Combobox(self, textvariable=self._render_mode, values=self.RENDER_MODES, state="readonly")
+		selector.place(relx=self.COMMON_X, rely=0.48, relheight=0.045, relwidth=0.1, anchor="ne")
+		selector.bind("<<ComboboxSelected>>", self.__render_mode_changed)
+
+	def __render_mode_changed(self, *args):
+		self.__reset_items()
+		self.__changed()
+
+	def __reset_items(self):
+		'''Forget the drawn canvas items, the next frame starts from a clean canvas'''
+		self._face_items = None
+		self._edge_items = None
+		self._raster_item = None
+		self._points = None
+		# The faces belong to the previous level (or object)
+		self._pick_index = None
+		self._hovered = -1
+
 	def __create_import_file_button(self):
 		ttk.Button(self, text="Screenshot", command=self.__take_screenshot).place(relx=self.COMMON_X, rely=0.895, relheight=0.05, relwidth=0.1, anchor="ne")
 
@@ -114,6 +236,33 @@ class GUI(tk.Tk):
 		ttk.Label(self, textvariable=self._file_name, foreground="#AAAAAA").place(relx=0.01, rely=0.96, relheight=0.035, relwidth=0.4)
 		ttk.Button(self, text="Import file", command=self.__read_file).place(relx=self.COMMON_X, rely=0.815, relheight=0.05, relwidth=0.1, anchor="ne")
 
+	def __create_turntable_button(self):
+		self._turntable_btn = ttk.Button(self, text="Turntable", command=self.__export_turntable)
+		self._turntable_btn.place(relx=self.COMMON_X, rely=0.735, relheight=0.05, relwidth=0.1, anchor="ne")
+
+	def __create_parts_button(self):
+		ttk.Button(self, text="Parts", command=self.__show_parts).place(relx=self.COMMON_X, rely=0.685, relheight=0.045, relwidth=0.1, anchor="ne")
+
+	def __create_pick_label(self):
+		'''Status of the hovered (or selected) face'''
+		self._pick_text = tk.StringVar()
+		ttk.Label(self, textvariable=self._pick_text, foreground="#AAAAAA").place(relx=0.42, rely=0.96, relheight=0.035, relwidth=0.3)
+
+	def __create_loading_progress(self):
+		'''Progress bar and cancel button of the background loading, only shown while loading'''
+		self._load_progress = tk.DoubleVar()
+		self._load_progress_bar = ttk.Progressbar(self, variable=self._load_progress, maximum=1.0, mode="determinate")
+		self._load_cancel_btn = ttk.Button(self, text="Cancel", command=self.__cancel_loading)
+
+	def __show_loading_progress(self, show: bool):
+		if show:
+			self._load_progress.set(0)
+			self._load_progress_bar.place(relx=0.42, rely=0.965, relheight=0.02, relwidth=0.2)
+			self._load_cancel_btn.place(relx=0.63, rely=0.955, relheight=0.04, relwidth=0.06)
+		else:
+			self._load_progress_bar.place_forget()
+			self._load_cancel_btn.place_forget()
+
 	def __create_up_down_left_right_buttons(self):
 		# Common values for placements of the buttons
 		COMM_X = 0.945
@@ -153,7 +302,36 @@ class GUI(tk.Tk):
 
 	def __create_fill_check(self):
 		self._check_no_fill = tk.IntVar()
-		ttk.Checkbutton(self, text="No fill", variable=self._check_no_fill, command=self.__changed, onvalue=True, offvalue=False).place(relx=0.80, rely=0.92)
+		ttk.Checkbutton(self, text="No fill", variable=self._check_no_fill, command=self.__style_changed, onvalue=True, offvalue=False).place(relx=0.80, rely=0.92)
+
+	def __create_wireframe_check(self):
+		self._check_wireframe = tk.BooleanVar()
+		ttk.Checkbutton(self, text="Wireframe", variable=self._check_wireframe, command=self.__render_mode_changed, onvalue=True, offvalue=False).place(relx=0.80, rely=0.955)
+
+	def __create_hud_check(self):
+		self._check_hud = tk.BooleanVar()
+		ttk.Checkbutton(self, text="HUD", variable=self._check_hud, command=self.__toggle_hud, onvalue=True, offvalue=False).place(relx=0.72, rely=0.955)
+
+	def __create_threads_spinbox(self):
+		'''Threads the projection of large meshes is split across'''
+		self._threads = tk.IntVar()
+		self._threads.set(self._geometry_handler.threads)
+		ttk.Label(self, text="Threads:").place(relx=0.42, rely=0.92, relheight=0.035)
+		spinbox = ttk.Spinbox(self, from_=1, to=max_threads(), textvariable=self._threads, command=self.__threads_changed, state="readonly")
+		spinbox.place(relx=0.465, rely=0.92, relheight=0.035, relwidth=0.04)
+
+	def __threads_changed(self, *args):
+		self._geometry_handler.set_threads(self._threads.get())
+		self.__changed()
+
+	def __create_lod_check(self):
+		self._check_lod = tk.BooleanVar()
+		self._check_lod.set(True)
+		ttk.Checkbutton(self, text="LOD while moving", variable=self._check_lod, command=self.__changed, onvalue=True, offvalue=False).place(relx=0.51, rely=0.92)
+
+	def __create_cull_check(self):
+		self._check_cull = tk.BooleanVar()
+		ttk.Checkbutton(self, text="Cull back faces", variable=self._check_cull, command=self.__changed, onvalue=True, offvalue=False).place(relx=0.66, rely=0.92)
 
 	def __pick_color_fill(self):
 		self.__pick_color("f")
@@ -184,7 +362,7 @@ class GUI(tk.Tk):
 				self.line_color.set(col[1])
 				self._line_btn['bg']  = col[1]
 		
-		self.__changed()
+		self.__style_changed()
 
 	def __mousewheel_scroll_in_canvas_up_event(self, *args):
 		'''callback to the scrolling up in canvas event'''
@@ -200,18 +378,21 @@ class GUI(tk.Tk):
 		if not self._check_x_continuos.get():
 			x, _, _ = self._geometry_handler.orientation
 			self.x_rotation_slider.set(x%math.pi)
+		self.__changed()
 
 	def __continuous_y(self, *args):
 		'''Callback to change event in checkbutton for continuous Y rotation'''
 		if not self._check_y_continuos.get():
 			_, y, _ = self._geometry_handler.orientation
 			self.y_rotation_slider.set(y%math.pi)
+		self.__changed()
 
 	def __continuous_z(self, *args):
 		'''Callback to change event in checkbutton for continuous Z rotation'''
 		if not self._check_z_continuos.get():
 			_, _, z = self._geometry_handler.orientation
 			self.z_rotation_slider.set(z%math.pi)
+		self.__changed()
 
 	def __get_canvas_shape(self):
 		"""returns the shape of the canvas holding the visualized frame"""
@@ -226,11 +407,33 @@ class GUI(tk.Tk):
 			self._geometry_handler.update_position((w-self._canvas_w)//2, (h-self._canvas_h)//2)
 			self._canvas_w = w
 			self._canvas_h = h
-			self.__changed()
+			self.__invalidate(self.TRANSLATION, self.CANVAS)
 
 	def __changed(self, *args):
-		'''Signal to the rendering function that something has changed in the object'''
-		self._changed = True
+		'''Signal to the rendering function that something has changed in the object, the next frame is drawn from scratch'''
+		self.__invalidate(*self.EVERYTHING)
+
+	def __invalidate(self, *kinds: str):
+		'''Signal what changed (POSE, ZOOM, TRANSLATION, STYLE, CANVAS), the next frame only redoes the work it invalidates'''
+		self._dirty.update(kinds)
+		self._scheduler.request()
+
+	def __style_changed(self, *args):
+		self.__invalidate(self.STYLE)
+
+	def request_frame(self):
+		'''Ask for a frame to be rendered (frames are otherwise only rendered on changes)'''
+		self._scheduler.request()
+
+	def __pose_changed(self, *args):
+		'''Signal a rotation input, the coarse level of detail is drawn until they stop'''
+		self._last_pose_input = time.perf_counter()
+		self.__invalidate(self.POSE)
+
+	def __zoom_changed(self, *args):
+		'''Signal a zoom input, the coarse level of detail is drawn until they stop'''
+		self._last_pose_input = time.perf_counter()
+		self.__invalidate(self.ZOOM)
 
 	def __reset_rotation(self):
 		self._geometry_handler.reset_rotation()
@@ -240,23 +443,86 @@ class GUI(tk.Tk):
 		self.__changed()
 
 	def __take_screenshot(self):
-		#Grab the top-left corner's coordinates
-		x = self.winfo_rootx() + self._canvas.winfo_x()
-		y = self.winfo_rooty() + self._canvas.winfo_y()
-
-		#Grab the bottom-right corner's coordinates
-		x1 = x + self._canvas.winfo_width()
-		y1 = y + self._canvas.winfo_height()
-
-		#Crop the screenshot to the determined coordinates
-		screenshot = ImageGrab.grab().crop((x, y, x1, y1))
+		'''Render the current view offscreen at the requested width (the canvas aspect ratio is kept) and save it as PNG'''
+		if not self._file_exists:
+			messagebox.showinfo(message="Import a file first", title="ERROR")
+			return
+		width = simpledialog.askinteger("Screenshot", "Image width (pixels):", initialvalue=self.SCREENSHOT_WIDTH,
+										minvalue=1, maxvalue=self.SCREENSHOT_MAX_WIDTH, parent=self)
+		if not width:
+			return
 		save_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=(("PNG Files", "*.png"), ("All Files", "*.*")))
 
 		#Check if they actually saved and didn't exit before saving
-		if save_path:
-			screenshot.save(save_path)
+		if not save_path:
+			return
+		# Always the full mesh, even if a coarser level of detail is on screen
+		level = self._geometry_handler.level
+		self._geometry_handler.set_level(0)
+		try:
+			frame = offscreen.render_scaled(
+				self._geometry_handler, self.__get_canvas_shape(), width,
+				fill=self._fill_color_holder, line=self._line_color_holder, background=self._canvas_color.get(),
+				cull_back_faces=self._check_cull.get(), wireframe=self._check_wireframe.get()
+			)
+		finally:
+			self._geometry_handler.set_level(level)
+		offscreen.write_png(save_path, frame)
+
+	def __export_turntable(self):
+		'''
+		Export a full turn of the current view (at the canvas size) to an animated GIF or a numbered PNG sequence.
+		The object turns around the first axis whose continuous rotation is checked, Y if none is.
+		The frames are rendered in other processes, the window stays responsive meanwhile
+		'''
+		if not self._file_exists:
+			messagebox.showinfo(message="Import a file first", title="ERROR")
+			return
+		frames = simpledialog.askinteger("Turntable", "Number of frames:", initialvalue=self.TURNTABLE_FRAMES, minvalue=2, parent=self)
+		if not frames:
+			return
+		save_path = filedialog.asksaveasfilename(defaultextension=".gif", filetypes=(("Animated GIF", "*.gif"), ("PNG sequence", "*.png")))
+		if not save_path:
+			return
+		checks = (('y', self._check_y_continuos), ('x', self._check_x_continuos), ('z', self._check_z_continuos))
+		axis = next((axis for axis, check in checks if check.get()), 'y')
+		# The pose is read here, the geometry keeps changing on this thread while the export runs
+		snapshot = turntable.snapshot(self._geometry_handler, save_path, frames, axis, canvas_size=self.__get_canvas_shape())
+		style = {
+			'fill': self._fill_color_holder, 'line': self._line_color_holder, 'background': self._canvas_color.get(),
+			'cull_back_faces': self._check_cull.get(), 'wireframe': self._check_wireframe.get(),
+		}
+
+		def run():
+			try:
+				turntable.export(snapshot, self.TURNTABLE_FPS, **style)
+				self._turntable_result = (save_path, None)
+			except Exception as e:
+				self._turntable_result = (save_path, e)
+
+		self._turntable_result = None
+		self._turntable_btn.state(["disabled"])
+		self._turntable_thread = threading.Thread(target=run, daemon=True)
+		self._turntable_thread.start()
+		self.after(self.LOADER_POLL_MS, self.__poll_turntable)
 
-	def __read_file(self):
+	def __poll_turntable(self):
+		'''Wait for the turntable export without blocking the event loop'''
+		if self._turntable_thread.is_alive():
+			self.after(self.LOADER_POLL_MS, self.__poll_turntable)
+			return
+		self._turntable_btn.state(["!disabled"])
+		path, error = self._turntable_result
+		if error is not None:
+			messagebox.showerror(message=f"The turntable export failed:\n{error}", title="ERROR")
+		else:
+			messagebox.showinfo(message=f"Turntable saved to {path}", title="Turntable")
+
+	def __add_part(self):
+		'''Load a file as one more part of the scene'''
+		self.__read_file(add=True)
+
+	def __read_file(self, add: bool = False):
 		messagebox.showinfo(message='Only .obj files are compatible!', title="WARNING")
 
 		file_path = filedialog.askopenfilename(defaultextension=".obj", filetypes=(("OBJ Files", "*.obj"), ("All Files", "*.*")))
@@ -265,58 +531,389 @@ class GUI(tk.Tk):
 			messagebox.showinfo(message="Incompatible file format", title="ERROR")
 
 		elif len(file_path):
-			self._file_name.set(file_path.split('/')[-1])
-			self.__reset_rotation()
-			with open(file_path) as file:
-				self._geometry_handler.upload_object(*obj_files_handler.extract_data(file))
-				self._file_exists = True
+			# Parse in the background, the current object stays interactive until the new one is ready
+			self._loading_name = file_path.split('/')[-1]
+			self._loading_part = add
+			self._file_name.set(f"Loading {self._loading_name}...")
+			self.__show_loading_progress(True)
+			self._loader.start(file_path, self.TRIANGULATE_ON_LOAD)
+			if not self._polling_loader:
+				self._polling_loader = True
+				self.after(self.LOADER_POLL_MS, self.__poll_loader)
+
+	def __cancel_loading(self):
+		self._loader.cancel()
+
+	def __poll_loader(self):
+		'''Consume the background loading events, swap the object in once it's completely loaded'''
+		# Checked before draining the events: once the worker is done, all its events are queued
+		loading = self._loader.busy
+		for event, value in self._loader.poll():
+			if event == 'progress':
+				self._load_progress.set(value)
+				continue
+
+			self.__show_loading_progress(False)
+			if event == 'done':
+				if not self._loading_part:
+					self._scene = Scene()
+					self.__reset_rotation()
+				self._scene.add(self._loading_name, value)
+				self.__upload_scene()
+			elif event == 'cancelled':
+				self._file_name.set(f"Loading {self._loading_name} cancelled")
+			else:
+				self._file_name.set(f"Couldn't load {self._loading_name}")
+				messagebox.showinfo(message=str(value), title="ERROR")
+
+		if loading:
+			self.after(self.LOADER_POLL_MS, self.__poll_loader)
+		else:
+			self._polling_loader = False
+
+	def __upload_scene(self):
+		'''Hand the visible parts of the scene to the geometry handler (packed into one mesh), and refresh the parts list'''
+		instances = self._scene.instances
+		self._file_name.set(instances[0].name if len(instances) == 1 else f"{instances[0].name} + {len(instances) - 1} part(s)")
+		self._file_exists = bool(self._scene.visible_count)
+		self._selected = None
+		if self._file_exists:
+			self._face_instances = self._geometry_handler.upload_scene(self._scene)
+		else:
+			# Everything is hidden, there is nothing to draw
+			self._canvas.delete("all")
+			self._hud_item = None
+		self.__reset_items()
+		self.__changed()
+		self.__refresh_parts()
+
+	def __show_parts(self):
+		'''Window listing the instances of the scene: show/hide them (double-click), add parts, duplicate them'''
+		if self._parts_window is not None and self._parts_window.winfo_exists():
+			self._parts_window.lift()
+			return
+		window = tk.Toplevel(self)
+		window.title("Parts")
+		window.geometry("320x360")
+		tree = ttk.Treeview(window, columns=("shown",), selectmode="extended")
+		tree.heading("#0", text="Part")
+		tree.heading("shown", text="Shown")
+		tree.column("shown", width=60, anchor="center", stretch=False)
+		tree.place(relx=0.02, rely=0.02, relwidth=0.96, relheight=0.82)
+		tree.bind("<Double-1>", self.__toggle_parts)
+		ttk.Button(window, text="Show/Hide", command=self.__toggle_parts).place(relx=0.02, rely=0.87, relheight=0.1, relwidth=0.3)
+		ttk.Button(window, text="Add part", command=self.__add_part).place(relx=0.35, rely=0.87, relheight=0.1, relwidth=0.3)
+		ttk.Button(window, text="Duplicate", command=self.__duplicate_parts).place(relx=0.68, rely=0.87, relheight=0.1, relwidth=0.3)
+		self._parts_window, self._parts_tree = window, tree
+		self.__refresh_parts()
+
+	def __refresh_parts(self):
+		if self._parts_window is None or not self._parts_window.winfo_exists():
+			return
+		selection = self._parts_tree.selection()
+		self._parts_tree.delete(*self._parts_tree.get_children())
+		for i, instance in enumerate(self._scene.instances):
+			self._parts_tree.insert("", "end", iid=str(i), text=instance.name, values=("\u2713" if instance.visible else "",))
+		self._parts_tree.selection_set([iid for iid in selection if self._parts_tree.exists(iid)])
+
+	def __selected_parts(self) -> 'list(int)':
+		return [int(iid) for iid in self._parts_tree.selection()] if self._parts_tree is not None else []
+
+	def __toggle_parts(self, *args):
+		'''Show the selected instances that are hidden, hide the others'''
+		selected = self.__selected_parts()
+		for i in selected:
+			self._scene.set_visible(i, not self._scene.instances[i].visible)
+		if selected:
+			self.__upload_scene()
+
+	def __duplicate_parts(self):
+		'''Place the selected instances once more, next to themselves along their X axis'''
+		selected = self.__selected_parts()
+		for i in selected:
+			instance = self._scene.instances[i]
+			low, high = self._scene.part_bounds(instance.part)
+			transform = instance.transform.copy()
+			transform[:3, 3] += transform[:3, :3] @ np.array(((high[0] - low[0])*self.DUPLICATE_SPACING, 0.0, 0.0))
+			self._scene.add_instance(instance.part, transform)
+		if selected:
+			self.__upload_scene()
+
+	def __toggle_hud(self):
+		'''The HUD needs the timings, profiling is on while it's shown'''
+		if self._hud_refresh is not None:
+			self.after_cancel(self._hud_refresh)
+			self._hud_refresh = None
+		if self._check_hud.get():
+			self._profiling_before_hud = profiler.enabled
+			profiler.enable()
+			self._hud_last = (profiler.timer('draw').count, time.perf_counter())
+			self._hud_text = "HUD: waiting for frames..."
+			self._hud_refresh = self.after(self.HUD_INTERVAL_MS, self.__refresh_hud)
+		else:
+			if not self._profiling_before_hud:
+				profiler.disable()
+			self._canvas.delete(self._hud_item)
+			self._hud_item = None
+		self.__changed()
+
+	def __refresh_hud(self):
+		'''Throttled update of the HUD text, from the recorded timings'''
+		self._hud_refresh = None
+		if not self._check_hud.get():
+			return
+		frames, now = profiler.timer('draw').count, time.perf_counter()
+		fps = (frames - self._hud_last[0])/(now - self._hud_last[1])
+		self._hud_last = (frames, now)
+
+		lines = [f"FPS      {fps:6.1f}"]
+		for label, name in (("transform", 'transform'), ("cull", 'cull'), ("draw", 'draw'), ("pick", 'pick')):
+			lines.append(f"{label:<9}{profiler.timer(name).stats()['p50']:6.2f} ms")
+		lines.append(f"items    {self._items_emitted:6d}")
+		if self._playback.running:
+			lines.append(f"ahead    {self._playback.buffered:6d}")
+		if len(self._scene.instances) > 1:
+			lines.append(f"parts    {self._scene.visible_count:3d}/{len(self._scene.instances):<3d}")
+		if self._file_exists:
+			verticies, faces = self._geometry_handler.counts(0)
+			lines.append(f"verts    {verticies:6d}")
+			lines.append(f"faces    {faces:6d}")
+			lines.append(f"mesh     {self._geometry_handler.mesh().nbytes/2**20:6.1f} MB")
+			if self._geometry_handler.level:
+				lines.append(f"LOD {self._geometry_handler.level}    {self._geometry_handler.counts()[1]:6d}")
+		self._hud_text = "\n".join(lines)
+		if self._hud_item is not None:
+			self._canvas.itemconfigure(self._hud_item, text=self._hud_text)
+		self._hud_refresh = self.after(self.HUD_INTERVAL_MS, self.__refresh_hud)
+
+	def __draw_hud(self):
+		'''Keep the HUD on top of the drawn frame (it might have been deleted with the rest)'''
+		if not self._check_hud.get():
+			return
+		if self._hud_item is None or self._canvas.type(self._hud_item) is None:
+			self._hud_item = self._canvas.create_text(10, 10, anchor="nw", text=self._hud_text, fill=self.HUD_COLOR, font="TkFixedFont")
+		else:
+			self._canvas.tag_raise(self._hud_item)
+
+	@profiler.timed('pick')
+	def __pick(self, x: int, y: int) -> int:
+		'''Face drawn at a point of the canvas (-1 if none), through a grid over the drawn faces (rebuilt only after a redraw)'''
+		if not self._file_exists or self._points is None:
+			return -1
+		if self._pick_index is None:
+			face_ids = self._drawn_faces if self._drawn_faces is not None else np.arange(self._geometry_handler.counts()[1])
+			self._pick_index = PickIndex(self._points, self._geometry_handler.face_layout, face_ids, (self._canvas_w, self._canvas_h))
+		# The raster mode shows the closest face, the canvas modes the last drawn one
+		z = self._geometry_handler.rotated[:, 2] if self._render_mode.get() == 'Raster' else None
+		return self._pick_index.pick(x, y, z)
+
+	def __describe_face(self, face: int, x: int, y: int) -> str:
+		'''Status text of a face: its id, its part, and the coordinates of its corner closest to (x, y)'''
+		level = self._geometry_handler.level
+		vertex = self._pick_index.nearest_corner(face, x, y)
+		vx, vy, vz = self._geometry_handler.mesh(level).verticies[vertex]
+		text = f"Face {face}"
+		if level:
+			text += f" (LOD {level})"
+		elif len(self._scene.instances) > 1:
+			text += f" of {self._scene.instances[self._face_instances[face]].name}"
+		return text + f", vertex {vertex}: ({vx:.3f}, {vy:.3f}, {vz:.3f})"
+
+	def __hover(self, event):
+		'''Outline the face under the mouse and describe it'''
+		face = self.__pick(event.x, event.y)
+		if face != self._hovered:
+			self._hovered = face
+			self.__draw_picks()
+		if face >= 0:
+			self._pick_text.set(self.__describe_face(face, event.x, event.y))
+		else:
+			self._pick_text.set(self._selected[2] if self._selected else "")
+
+	def __unhover(self, *args):
+		self._hovered = -1
+		self.__draw_picks()
+		self._pick_text.set(self._selected[2] if self._selected else "")
+
+	def __select(self, event):
+		'''Select the clicked face (clicking the background clears the selection)'''
+		face = self.__pick(event.x, event.y)
+		self._selected = None if face < 0 else (self._geometry_handler.level, face, "Selected: " + self.__describe_face(face, event.x, event.y))
+		self._pick_text.set(self._selected[2] if self._selected else "")
+		self.__draw_picks()
+
+	def __draw_picks(self):
+		'''Outline the hovered and the selected faces on top of the frame'''
+		selected = self._selected[1] if self._selected and self._selected[0] == self._geometry_handler.level else -1
+		for key, face, color in (('hover', self._hovered, self.HOVER_COLOR), ('select', selected, self.SELECT_COLOR)):
+			item = self._pick_items.get(key)
+			coords = self._geometry_handler.assemble_faces(self._points, np.array((face,)))[0] if face >= 0 and self._file_exists and self._points is not None else ()
+			if len(coords) < 6:
+				# Nothing to outline (points and lines can't be picked anyway)
+				if item is not None:
+					self._canvas.delete(item)
+					del self._pick_items[key]
+			elif item is None or self._canvas.type(item) is None:
+				self._pick_items[key] = self._canvas.create_polygon(coords, fill="", outline=color, width=2)
+			else:
+				self._canvas.coords(item, coords)
+				self._canvas.tag_raise(item)
+
+	def __press(self, event):
+		self._press = (event.x, event.y)
+		self._drag_from = self._drag_to = None
+
+	def __drag(self, event):
+		'''
+		Arcball rotation. Tk delivers motion events much faster than frames get drawn: they only record
+		the pointer position, the next frame applies the whole rotation since the last one at once
+		'''
+		if self._press is None:
+			return
+		if self._drag_from is None:
+			if abs(event.x - self._press[0]) + abs(event.y - self._press[1]) < self.CLICK_SLOP:
+				return
+			self._drag_from = self._press
+		self._drag_to = (event.x, event.y)
+		self.__pose_changed()
+
+	def __release(self, event):
+		if self._press is not None and self._drag_from is None:
+			self.__select(event)
+		self._press = None
+
+	def __arcball_vector(self, x: int, y: int) -> 'np.ndarray':
+		'''Point of the canvas on the arcball, a unit sphere around the object (view space: X right, Y up, Z towards the viewer)'''
+		cx, cy = self._geometry_handler.position
+		radius = max(min(self._canvas_w, self._canvas_h)*self.ARCBALL_RADIUS, 1)
+		vector = np.array(((x - cx)/radius, (cy - y)/radius, 0.0))
+		length = vector[0]**2 + vector[1]**2
+		if length < 1:
+			vector[2] = math.sqrt(1 - length)
+		else:
+			# Outside of the ball, the point slides on its silhouette
+			vector /= math.sqrt(length)
+		return vector
+
+	def __apply_drag(self):
+		'''Turn the object by the arcball rotation from where the drag was last applied to the latest pointer position'''
+		if self._drag_from is None or self._drag_to is None or self._drag_to == self._drag_from:
+			return
+		start, end = self.__arcball_vector(*self._drag_from), self.__arcball_vector(*self._drag_to)
+		self._drag_from = self._drag_to
+		axis = np.cross(start, end)
+		sin = np.linalg.norm(axis)
+		if sin < 1e-9:
+			return
+		rot_x, rot_y, rot_z = rotation_matrices(*self._geometry_handler.orientation)
+		x, y, z = euler_angles(axis_rotation(axis/sin, math.atan2(sin, np.dot(start, end))) @ rot_z @ rot_x @ rot_y)
+		self._geometry_handler.reset_rotation(x, y, z)
+		# The sliders hold the angles of the axes that don't turn continuously (those hold the speed)
+		for slider, check, angle in ((self.x_rotation_slider, self._check_x_continuos, x),
+									 (self.y_rotation_slider, self._check_y_continuos, y),
+									 (self.z_rotation_slider, self._check_z_continuos, z)):
+			if not check.get():
+				slider.set(angle)
+
+	def __pan_start(self, event):
+		self._pan_from = (event.x, event.y)
+
+	def __pan(self, event):
+		'''Middle-drag panning, a translation only: the redraw just shifts the projected points'''
+		if self._pan_from is None:
+			return
+		self._geometry_handler.update_position(event.x - self._pan_from[0], event.y - self._pan_from[1])
+		self._pan_from = (event.x, event.y)
+		self.__invalidate(self.TRANSLATION)
 
 	def __move_up(self):
 		self._geometry_handler.update_position(0, -1 * self.MOVING_STEP)
-		self.__changed()
+		self.__invalidate(self.TRANSLATION)
 
 	def __move_down(self):
 		self._geometry_handler.update_position(0, self.MOVING_STEP)
-		self.__changed()
+		self.__invalidate(self.TRANSLATION)
 
 	def __move_left(self):
 		self._geometry_handler.update_position(-1 * self.MOVING_STEP, 0)
-		self.__changed()
+		self.__invalidate(self.TRANSLATION)
 
 	def __move_right(self):
 		self._geometry_handler.update_position(self.MOVING_STEP, 0)
-		self.__changed()
+		self.__invalidate(self.TRANSLATION)
 
-#	@time_me
-	def render(self):
-		'''Render the object on the screen'''
+	@profiler.timed('frame')
+	def render(self) -> bool:
+		'''Render the object on the screen, returns whether another frame is needed right after'''
 		# We need the continuous rotation to be enabled on one axis, and for the step to be non-zero
 		continuous = ( (self.x_rotation_slider.get() and self._check_x_continuos.get()) 
 		 			or (self.y_rotation_slider.get() and self._check_y_continuos.get()) 
 		 			or (self.z_rotation_slider.get() and self._check_z_continuos.get())
 		)
 
-		if continuous: self.__step_rotations()
+		self.__apply_drag()
 		self.__set_rotations()
 		self.__set_zoom()
+		if self._file_exists: self.__set_level(continuous)
 
-		if self._file_exists and (self._changed or continuous):
-			#Delete all the previous points and lines in order to draw new ones
-			self._canvas.delete("all")
+		projected = None
+		if self._file_exists and continuous:
+			projected = self.__play()
+			if projected is None:
+				# The next frame isn't projected yet, keep showing this one
+				return True
+		else:
+			self._playback.flush()
+
+		if self._file_exists and (self._dirty or projected is not None):
 			self.__update_colors()
-			self.__draw_object()
-			self._changed = False
+			self.__draw_object(projected)
+			self._dirty.clear()
+
+		# Keep animating, or keep checking until the full level of detail is back
+		return bool(self._file_exists and (continuous or self._geometry_handler.level != 0))
+
+	def __set_level(self, continuous: bool):
+		'''Draw the coarse level of detail while the pose is changing, the full mesh once it's idle'''
+		interacting = continuous or (time.perf_counter() - self._last_pose_input)*1000 < self.LOD_IDLE_MS
+		level = self.LOD_LEVEL if self._check_lod.get() and interacting else 0
+		if self._geometry_handler.set_level(level):
+			# The retained items belong to the previous level
+			self.__reset_items()
+			self.__changed()
 
 	def __set_zoom(self):
 		self._geometry_handler.set_zoom(self._zoom_slider.get())
 
-	def __step_rotations(self):
-		'''Increment the rotation angle by 1% on the enables axis'''
-		self._geometry_handler.step_rotation(
+	def __rotation_steps(self) -> 'tuple(float, float, float)':
+		'''The continuous rotation increments the angle by 1% of the slider value every frame, on the enabled axis'''
+		return (
 			(self.x_rotation_slider.get()/100)*self._check_x_continuos.get(),
 			(self.y_rotation_slider.get()/100)*self._check_y_continuos.get(),
 			(self.z_rotation_slider.get()/100)*self._check_z_continuos.get(),
 		)
+
+	def __play(self) -> 'tuple(np.ndarray, tuple(int, int))':
+		'''
+		Continuous rotation: the next frame comes from the playback buffer, projected ahead of time on its worker thread.
+		Returns its (points, position the points are projected at), None if it isn't ready yet
+		'''
+		steps = self.__rotation_steps()
+		if self._dirty & self.REPROJECT or self._playback.step != steps:
+			# The pose changed under the playback (sliders, zoom, level of detail...), the frames projected ahead are stale
+			self._playback.flush()
+			self._dirty -= self.REPROJECT
+		if not self._playback.running:
+			# The back-face culling and the raster depth (drawing and picking) need the rotated verticies,
+			# dropping them would have the Tk thread rotate the whole mesh again every frame
+			keep_rotated = self._check_cull.get() or self._render_mode.get() == 'Raster'
+			self._playback.start(self._geometry_handler, steps, keep_rotated=keep_rotated)
+		frame = self._playback.take()
+		if frame is None:
+			return None
+		orientation, points, position, rotated = frame
+		self._geometry_handler.set_projected_pose(orientation, rotated)
+		return points, position
 	
 	def __set_rotations(self):
 		'''Set the required rotations for the geometry handler'''
@@ -345,29 +942,191 @@ class GUI(tk.Tk):
 						   		 width=self.POINT_SIZE,
 						   		 fill=self.POINT_COLOR)
 
-	@time_me
-	def __draw_faces(self, points: dict) -> None:
-		''''''
-		for face in self._geometry_handler.faces:
-			# Grab the points that make up that specific face
-			to_draw = [points[f] for f in face]
-			
-			#for point in to_draw:
-			#	if(point[0] < 0 or
-			#	   point[1] < 0 or
-			#	   point[0] > self.CANVAS_WIDTH or
-			#	   point[1] > self.CANVAS_HEIGHT
-			#	):
-			#		continue # Don't draw points that are out of the screen
-			#	# This is the slowest part of the GUI
-			#	self.__draw_point(point)
-
-			self._canvas.create_polygon(to_draw, outline=self._line_color_holder, fill=self._fill_color_holder)
+	def __draw_faces(self, points: 'np.ndarray', moved: 'tuple(int, int)' = None) -> None:
+		'''
+		Draw the faces of the object from its projected points.
+		moved is the shift of the points since the last frame when they weren't re-projected (None if they were).
+		Only the canvas work is timed as 'draw', the culling has its own timer
+		'''
+		if self._check_wireframe.get():
+			self._drawn_faces = None
+			with profiler.span('draw'):
+				self.__draw_edges(points, moved)
+			return
+
+		# Faces outside of the canvas or smaller than a pixel are never handed to Tk
+		face_ids = self._geometry_handler.visible_faces(
+			points,
+			cull_back_faces=self._check_cull.get(),
+			viewport=(self._canvas_w, self._canvas_h),
+			min_area=self.MIN_FACE_AREA
+		)
+		self._drawn_faces = face_ids
+		with profiler.span('draw'):
+			self.__emit_faces(points, face_ids, moved)
+
+	def __emit_faces(self, points: 'np.ndarray', face_ids: 'np.ndarray', moved: 'tuple(int, int)' = None) -> None:
+		'''Hand the visible faces to the canvas, the way the render mode does it'''
+		if self._render_mode.get() == 'Retained':
+			self.__move_face_items(points, face_ids, moved)
+			return
+		if self._render_mode.get() == 'Raster':
+			self.__blit_faces(points, face_ids)
+			return
+
+		faces = self._geometry_handler.assemble_faces(points, face_ids)
+
+		#Delete all the previous points and lines in order to draw new ones
+		self._canvas.delete("all")
+		for to_draw in faces:
+			self._canvas.create_polygon(to_draw, outline=self._line_color_holder, fill=self._fill_color_holder, tags=self.FACE_TAG)
+		self._items_style = (self._fill_color_holder, self._line_color_holder)
+		self._items_emitted = len(faces)
+
+	def __draw_edges(self, points: 'np.ndarray', moved: 'tuple(int, int)' = None) -> None:
+		'''Wireframe: every edge of the mesh is drawn once, chained into as few polylines as possible'''
+		if self._render_mode.get() == 'Raster':
+			self.__blit(self.__rasterizer().render_wireframe(self._geometry_handler, points, self._line_color_holder, self._canvas_color.get()))
+			return
+
+		immediate = self._render_mode.get() == 'Immediate'
+		if moved is not None and (immediate or self._edge_items is not None):
+			# Nothing is culled in wireframe, a translation shifts every drawn line with a single command
+			if any(moved):
+				self._canvas.move(self.FACE_TAG, *moved)
+			self.__restyle_items()
+			self._items_emitted = 0
+			return
+
+		lines = self._geometry_handler.assemble_edges(points)
+		if immediate:
+			self._canvas.delete("all")
+			for to_draw in lines:
+				self._canvas.create_line(to_draw, fill=self._line_color_holder, tags=self.FACE_TAG)
+			self._items_style = ("", self._line_color_holder)
+			self._items_emitted = len(lines)
+			return
+
+		if self._edge_items is None:
+			self._canvas.delete("all")
+			self._edge_items = [self._canvas.create_line(to_draw, fill=self._line_color_holder, tags=self.FACE_TAG) for to_draw in lines]
+			self._items_style = ("", self._line_color_holder)
+			self._items_emitted = len(lines)
+			return
+		self.__restyle_items()
+		call, canvas = self._canvas.tk.call, self._canvas._w
+		for item, to_draw in zip(self._edge_items, lines):
+			call(canvas, 'coords', item, to_draw)
+		self._items_emitted = len(lines)
+
+	def __restyle_items(self) -> bool:
+		'''
+		Recolor the drawn faces or edges with a single tagged command, if the colors changed since they were drawn.
+		Returns False when there are no items to recolor (raster mode, retained items not created yet): the frame has to be drawn
+		'''
+		mode, wireframe = self._render_mode.get(), self._check_wireframe.get()
+		if mode == 'Raster' or (mode == 'Retained' and (self._edge_items if wireframe else self._face_items) is None):
+			return False
+		style = ("", self._line_color_holder) if wireframe else (self._fill_color_holder, self._line_color_holder)
+		if style != self._items_style:
+			if wireframe:
+				self._canvas.itemconfigure(self.FACE_TAG, fill=self._line_color_holder)
+			else:
+				self._canvas.itemconfigure(self.FACE_TAG, fill=self._fill_color_holder, outline=self._line_color_holder)
+			self._items_style = style
+		return True
+
+	def __rasterizer(self) -> Rasterizer:
+		'''The software renderer, sized like the canvas'''
+		if self._rasterizer is None:
+			self._rasterizer = Rasterizer(self._canvas_w, self._canvas_h)
+		self._rasterizer.resize(self._canvas_w, self._canvas_h)
+		return self._rasterizer
+
+	def __blit(self, frame: 'np.ndarray') -> None:
+		'''Show a rendered frame on the canvas, as a single image'''
+		self._raster_image = tk.PhotoImage(width=frame.shape[1], height=frame.shape[0], data=self._rasterizer.to_ppm(), format='PPM')
+		if self._raster_item is None:
+			self._canvas.delete("all")
+			self._raster_item = self._canvas.create_image(0, 0, anchor="nw", image=self._raster_image)
+		else:
+			self._canvas.itemconfigure(self._raster_item, image=self._raster_image)
+		self._items_emitted = 1
+
+	def __blit_faces(self, points: 'np.ndarray', face_ids: 'np.ndarray') -> None:
+		'''Raster mode: the faces are rasterized off-screen, then shown as a single image'''
+		self.__blit(self.__rasterizer().render(
+			self._geometry_handler, points, face_ids, self._fill_color_holder, self._line_color_holder, self._canvas_color.get()
+		))
+
+	def __move_face_items(self, points: 'np.ndarray', face_ids: 'np.ndarray' = None, moved: 'tuple(int, int)' = None) -> None:
+		'''
+		Retained mode: the polygons are created once, later frames only move them (and restyle them if needed).
+		Culled faces are hidden rather than deleted, so the stacking order never changes.
+		When the points were only shifted (moved), one canvas move places every polygon
+		'''
+		if self._face_items is None:
+			self._canvas.delete("all")
+			# Items stack in creation order, which is the order the immediate mode draws the faces in
+			self._face_items = [
+				self._canvas.create_polygon(to_draw, outline=self._line_color_holder, fill=self._fill_color_holder, tags=self.FACE_TAG)
+				for to_draw in self._geometry_handler.assemble_faces(points)
+			]
+			self._items_style = (self._fill_color_holder, self._line_color_holder)
+			self._items_shown = np.ones(len(self._face_items), dtype=bool)
+			moved = (0, 0) # Already in place
+		self.__restyle_items()
+
+		shown = np.ones(len(self._face_items), dtype=bool)
+		if face_ids is not None:
+			shown[:] = False
+			shown[face_ids] = True
+		# Only the faces that got culled (or uncovered) since the last frame change state
+		toggled = np.flatnonzero(shown != self._items_shown).tolist()
+		for i in toggled:
+			self._canvas.itemconfigure(self._face_items[i], state='normal' if shown[i] else 'hidden')
+		if moved is not None:
+			if any(moved):
+				self._canvas.move(self.FACE_TAG, *moved)
+			# Hidden polygons were last placed at an older pose, only the ones coming back into view need their coordinates
+			face_ids = np.flatnonzero(shown & ~self._items_shown)
+		self._items_shown = shown
+		self._items_emitted = len(toggled) + (len(shown) if face_ids is None else len(face_ids))
+
+		# Straight to Tcl: Canvas.coords() would also parse back the coordinates it just set
+		call, canvas, items = self._canvas.tk.call, self._canvas._w, self._face_items
+		if face_ids is None:
+			for item, to_draw in zip(items, self._geometry_handler.assemble_faces(points)):
+				call(canvas, 'coords', item, to_draw)
+		else:
+			for i, to_draw in zip(face_ids.tolist(), self._geometry_handler.assemble_faces(points, face_ids)):
+				call(canvas, 'coords', items[i], to_draw)
 	
-	def __draw_object(self):
-		'''Draw the object on the canvas'''
-		projected_points = self._geometry_handler.transform_object()
-		self.__draw_faces(projected_points)
+	def __draw_object(self, projected: 'tuple(np.ndarray, tuple(int, int))' = None):
+		'''
+		Draw the object on the canvas, only redoing the work the changes since the last frame invalidated:
+		rotations and zoom re-project it, a translation shifts the last projected points, a new style recolors the drawn items.
+		projected: (points, position) of a frame projected ahead of time, drawn instead of projecting the pose
+		'''
+		position = self._geometry_handler.position
+		reprojected = True
+		if projected is not None:
+			self._points, self._points_position = projected
+		elif self._points is None or self._dirty & self.REPROJECT:
+			self._points, self._points_position = self._geometry_handler.transform_object(), position
+		elif self._dirty <= {self.STYLE} and self.__restyle_items():
+			return
+		else:
+			reprojected = False
+		# The position is added after the (truncated) projection, shifting the points gives exactly the projected ones
+		moved = (position[0] - self._points_position[0], position[1] - self._points_position[1])
+		if any(moved):
+			self._points += moved
+		self._points_position = position
+		self.__draw_faces(self._points, None if reprojected else moved)
+		self._pick_index = None
+		self.__draw_hud()
+		self.__draw_picks()
 	
 	def __update_colors(self):
 		self.__change_fill_color(self.fill_color.get(), self._check_no_fill.get())
@@ -0,0 +1,63 @@
+import numpy as np
+
+MAX_RESOLUTION = 1024 # Finest clustering grid tried (cells per side)
+
+def cluster_decimate(verticies: np.ndarray,
+					 triangles: np.ndarray,
+					 resolution: int
+) -> 'tuple(np.ndarray, np.ndarray)':
+	'''
+	@brief: Simplify a mesh by vertex clustering, the verticies falling in the same
+			cell of a uniform grid get merged into their average
+	@param verticies: (N, 3) verticies
+	@param triangles: (T, 3) vertex indices
+	@param resolution: Number of grid cells along the longest side of the mesh
+	@return verticies, triangles: The simplified mesh (triangles keep their original order)
+	'''
+	low = verticies.min(axis=0)
+	span = max(float((verticies.max(axis=0) - low).max()), 1e-12)
+	cells = np.clip(((verticies - low)/span*resolution).astype(np.int64), 0, resolution - 1)
+	keys = (cells[:, 0]*resolution + cells[:, 1])*resolution + cells[:, 2]
+	_, cluster = np.unique(keys, return_inverse=True)
+	cluster = cluster.ravel()
+
+	counts = np.bincount(cluster)
+	merged = np.stack([np.bincount(cluster, weights=verticies[:, axis])/counts for axis in range(3)], axis=1)
+
+	remapped = cluster[triangles]
+	# Triangles whose corners merged together vanish, and so do the duplicates
+	valid = (remapped[:, 0] != remapped[:, 1]) & (remapped[:, 1] != remapped[:, 2]) & (remapped[:, 0] != remapped[:, 2])
+	remapped = remapped[valid]
+	_, first = np.unique(np.sort(remapped, axis=1), axis=0, return_index=True)
+	return merged, remapped[np.sort(first)]
+
+def build_levels(verticies: np.ndarray,
+				 triangles: np.ndarray,
+				 face_count: int,
+				 targets: 'tuple(int)'
+) -> 'list(tuple(np.ndarray, np.ndarray))':
+	'''
+	@brief: Build the simplified versions of a mesh
+	@param verticies, triangles: The full mesh, triangulated (see mesh.fan_triangulate)
+	@param face_count: Number of faces of the full mesh, before the triangulation
+	@param targets: Maximum number of faces of every level, finest first
+	@return levels: (verticies, triangles) of every level whose target is lower than the mesh's face count
+	'''
+	levels = []
+	low, high = 1, MAX_RESOLUTION
+	for target in sorted(targets, reverse=True):
+		if target >= face_count:
+			continue
+		# Finest grid that stays within the target (the face count grows with the resolution)
+		best = cluster_decimate(verticies, triangles, low)
+		while low < high:
+			mid = (low + high + 1)//2
+			level = cluster_decimate(verticies, triangles, mid)
+			if len(level[1]) <= target:
+				low, best = mid, level
+			else:
+				high = mid - 1
+		levels.append(best)
+		# Coarser levels need coarser grids
+		low, high = 1, low
+	return levels
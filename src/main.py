@@ -1,4 +1,5 @@
 from gui import GUI
+from timer import profiler
 
 import gc
 
@@ -14,10 +15,12 @@ class main_:
         self._gui = GUI(*args, **kwargs)
 
     def _update_display(self):
-        self._gui.render()
-        self._gui.after(1, self._update_display)
+        # Frames are then scheduled by the GUI itself, whenever something changes
+        self._gui.request_frame()
 
 if __name__ == '__main__':
     main_()
+    if profiler.enabled:
+        print(profiler.format_report())
 
 gc.collect()
\ No newline at end of file
@@ -0,0 +1,191 @@
+import sys
+import numpy as np
+
+def fan_triangulate(indices: np.ndarray, offsets: np.ndarray) -> 'tuple(np.ndarray, np.ndarray, np.ndarray)':
+	'''
+	@brief: Split every face into a fan of triangles around its first corner, one vectorized pass
+			per face size (all the quads at once, then all the pentagons...)
+	@param indices, offsets: CSR layout of the faces (see Mesh)
+	@return triangles, faces, triangle_offsets: (T, 3) int32 vertex indices grouped by face in face order,
+			the int32 face every triangle comes from, and the (F + 1) int32 first triangle of every face
+			(faces with less than 3 corners have none)
+	'''
+	sizes = np.diff(offsets)
+	triangle_offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+	np.cumsum(np.maximum(sizes - 2, 0), out=triangle_offsets[1:])
+	count = int(triangle_offsets[-1])
+	triangles = np.empty((count, 3), dtype=np.int32)
+	faces = np.empty(count, dtype=np.int32)
+	for size in np.unique(sizes):
+		if size < 3:
+			continue
+		ids = np.flatnonzero(sizes == size)
+		if len(ids) == len(sizes):
+			corners = indices.reshape((-1, size))
+		else:
+			corners = indices[offsets[ids, None] + np.arange(size)] # (n, size)
+		fan = np.arange(1, size - 1)
+		# (n, size - 2, 3): the first corner with every pair of consecutive others
+		fans = np.empty((len(ids), size - 2, 3), dtype=np.int32)
+		fans[:, :, 0] = corners[:, :1]
+		fans[:, :, 1] = corners[:, fan]
+		fans[:, :, 2] = corners[:, fan + 1]
+		if len(ids) == len(sizes):
+			# Every face has that size
+			triangles[:] = fans.reshape((-1, 3))
+			faces[:] = np.repeat(ids, size - 2)
+			break
+		# Every fan goes straight to its place, so the triangles end up in face order without sorting
+		slots = (triangle_offsets[ids, None] + np.arange(size - 2)).ravel()
+		triangles[slots] = fans.reshape((-1, 3))
+		faces[slots] = np.repeat(ids, size - 2)
+	return triangles, faces, triangle_offsets.astype(np.int32)
+
+class Mesh:
+	'''
+	Compact, array-backed mesh.
+	The verticies are a float32 (N, 3) array indexed from 0, and the faces are stored in CSR layout:
+	the int32 vertex indices of all the faces back to back, and the F+1 int32 offsets where every face
+	starts (the last one being the total number of indices)
+	'''
+	def __init__(self, verticies: np.ndarray, indices: np.ndarray, offsets: np.ndarray) -> None:
+		'''
+		@param verticies: (N, 3) vertex coordinates (not copied if already float32, e.g. memory-mapped)
+		@param indices: Flat 0-based vertex indices of all the faces
+		@param offsets: (F + 1) start of every face in indices, then len(indices)
+		'''
+		self._verticies = np.ascontiguousarray(verticies, dtype=np.float32).reshape((-1, 3))
+		self._indices = np.ascontiguousarray(indices, dtype=np.int32)
+		self._offsets = np.ascontiguousarray(offsets, dtype=np.int32)
+		self._sizes = None
+		self._fixed = False # Unknown yet, None when the faces have different sizes
+		self._triangles = None # (triangles, triangle_faces, triangle_offsets), once triangulated
+
+	@classmethod
+	def from_sizes(cls, verticies: np.ndarray, indices: np.ndarray, sizes: np.ndarray) -> 'Mesh':
+		'''Build a mesh from flat 0-based indices and the number of corners of every face'''
+		offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+		np.cumsum(sizes, out=offsets[1:])
+		return cls(verticies, indices, offsets)
+
+	@classmethod
+	def from_faces(cls, verticies: np.ndarray, faces: 'list(list(int))') -> 'Mesh':
+		'''Build a mesh from a list of faces (lists of 0-based vertex indices)'''
+		sizes = np.fromiter(map(len, faces), dtype=np.int64, count=len(faces))
+		indices = np.fromiter((i for face in faces for i in face), dtype=np.int64, count=int(sizes.sum()))
+		return cls.from_sizes(verticies, indices, sizes)
+
+	def with_verticies(self, verticies: np.ndarray) -> 'Mesh':
+		'''Same faces (shared, not copied) over other verticies'''
+		mesh = Mesh(verticies, self._indices, self._offsets)
+		mesh._sizes, mesh._fixed, mesh._triangles = self._sizes, self._fixed, self._triangles
+		return mesh
+
+	def triangulate(self) -> 'Mesh':
+		'''
+		@brief: Fan-triangulate the faces (once), see triangles. The faces themselves are kept
+				as they are, for the outlines to follow the source polygons
+		@return: The mesh itself
+		'''
+		if self._triangles is None:
+			self._triangles = fan_triangulate(self._indices, self._offsets)
+		return self
+
+	@property
+	def triangulated(self) -> bool:
+		return self._triangles is not None
+
+	@property
+	def triangles(self) -> np.ndarray:
+		'''(T, 3) int32 vertex indices of the triangles, grouped by face in face order (None until triangulated)'''
+		return None if self._triangles is None else self._triangles[0]
+
+	@property
+	def triangle_faces(self) -> np.ndarray:
+		'''(T) int32 face every triangle comes from (None until triangulated)'''
+		return None if self._triangles is None else self._triangles[1]
+
+	@property
+	def triangle_offsets(self) -> np.ndarray:
+		'''(F + 1) int32 first triangle of every face, then T (None until triangulated)'''
+		return None if self._triangles is None else self._triangles[2]
+
+	@property
+	def verticies(self) -> np.ndarray:
+		'''(N, 3) float32 vertex coordinates'''
+		return self._verticies
+
+	@property
+	def indices(self) -> np.ndarray:
+		'''int32 vertex indices of all the faces back to back'''
+		return self._indices
+
+	@property
+	def offsets(self) -> np.ndarray:
+		'''(F + 1) int32 start of every face in indices, then len(indices)'''
+		return self._offsets
+
+	@property
+	def starts(self) -> np.ndarray:
+		'''(F) start of every face in indices'''
+		return self._offsets[:-1]
+
+	@property
+	def sizes(self) -> np.ndarray:
+		'''(F) number of corners of every face'''
+		if self._sizes is None:
+			self._sizes = np.diff(self._offsets)
+		return self._sizes
+
+	@property
+	def vertex_count(self) -> int:
+		return len(self._verticies)
+
+	@property
+	def face_count(self) -> int:
+		return len(self._offsets) - 1
+
+	@property
+	def fixed(self) -> np.ndarray:
+		'''(F, k) view of the faces when they all have k corners (triangles, quads...), else None'''
+		if self._fixed is False:
+			sizes = self.sizes
+			uniform = len(sizes) and sizes.min() == sizes.max()
+			self._fixed = self._indices.reshape((-1, int(sizes[0]))) if uniform else None
+		return self._fixed
+
+	def to_lists(self) -> 'list(list(int))':
+		'''The faces as lists of vertex indices (slow and big, only meant for interoperability)'''
+		flat = self._indices.tolist()
+		offsets = self._offsets.tolist()
+		return [flat[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+	@property
+	def nbytes(self) -> int:
+		'''Memory held by the arrays of the mesh'''
+		return self._verticies.nbytes + self._indices.nbytes + self._offsets.nbytes + self.__triangles_nbytes()
+
+	def __triangles_nbytes(self) -> int:
+		return 0 if self._triangles is None else sum(array.nbytes for array in self._triangles)
+
+	def memory_report(self) -> dict:
+		'''
+		@brief: Bytes used by every array of the mesh, and an estimate of what the same mesh took
+				as a float64 vertex array (with a placeholder row) and a list of faces (lists of ints)
+		@Note: The estimate counts the list objects, their item pointers, and one int object per
+			   index beyond the ones CPython keeps cached (-5..256)
+		'''
+		faces = self.face_count
+		big_ints = int(np.count_nonzero(self._indices > 256))
+		lists = sys.getsizeof([]) + 8*faces + sys.getsizeof([])*faces + 8*len(self._indices) + sys.getsizeof(2**20)*big_ints
+		return {
+			'verticies': self._verticies.nbytes,
+			'indices': self._indices.nbytes,
+			'offsets': self._offsets.nbytes,
+			'triangles': self.__triangles_nbytes(),
+			'total': self.nbytes,
+			'legacy': (self.vertex_count + 1)*3*8 + lists,
+		}
+
+	def __repr__(self) -> str:
+		return f'Mesh({self.vertex_count} verticies, {self.face_count} faces, {self.nbytes/2**20:.1f}MB)'
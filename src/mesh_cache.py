@@ -0,0 +1,192 @@
+import obj_files_handler
+from mesh import Mesh
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import typing
+import argparse
+import numpy as np
+
+if typing.TYPE_CHECKING:
+	import threading
+
+class MeshCache:
+	'''
+	Binary cache of parsed meshes.
+	Every entry is a folder named after the content hash of the .obj file, holding the
+	arrays of its Mesh as .npy files that get memory-mapped on reuse
+	'''
+	DEFAULT_DIR = os.environ.get('MESH_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', '3d_viz', 'meshes'))
+	DEFAULT_MAX_BYTES = 1 << 30 # 1GB
+	INDEX_FILE = 'index.json'
+	ARRAYS = ('verticies', 'indices', 'offsets') # Entries of an older layout fail to load, and get parsed again
+
+	def __init__(self, directory: str = None, max_bytes: int = None) -> None:
+		'''
+		@param directory: Folder holding the cache entries
+		@param max_bytes: Size cap of the cache, the least recently used entries get evicted beyond it
+		'''
+		self._dir = directory or self.DEFAULT_DIR
+		self._max_bytes = self.DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+		os.makedirs(self._dir, exist_ok=True)
+		self._index = self.__read_index()
+
+	def extract_data(self, file_path: str, **kwargs) -> Mesh:
+		'''Cached equivalent of obj_files_handler.extract_data, taking a path instead of a file'''
+		return self.load(file_path, **kwargs)
+
+	def load(self, 
+			 file_path: str,
+			 progress: 'callable(int, int)' = None,
+			 cancel: 'threading.Event' = None,
+			 triangulate: bool = False
+	) -> Mesh:
+		'''
+		@brief: Get the parsed mesh of a .obj file, from the cache if possible
+		@param file_path: Path of the .obj file
+		@param progress: Optional callable(done, total) reporting the progress of the whole load:
+						 the reading of the file fills its first half, the parsing stages the second one
+		@param cancel: Optional event that aborts the load (raising LoadCancelled) once set
+		@param triangulate: Also triangulate the faces (not cached, it's cheap compared to the parsing)
+		@return: The mesh, its arrays are memory-mapped from the cache
+		'''
+		file_path = os.path.abspath(file_path)
+		stat = os.stat(file_path)
+		known = self._index['files'].get(file_path)
+
+		# Same path, size and modification time: trust the content hash we already computed
+		if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+			mesh = self.__read_entry(known['hash'])
+			if mesh is not None:
+				self.__write_index()
+				if progress is not None:
+					progress(stat.st_size, stat.st_size)
+				return mesh.triangulate() if triangulate else mesh
+
+		with open(file_path, 'rb') as file:
+			data = obj_files_handler.read_in_chunks(file, 2*stat.st_size, progress, cancel)
+		key = hashlib.blake2b(data, digest_size=16).hexdigest()
+		self._index['files'][file_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': key}
+
+		# The content might have been cached under another path (or before a touch)
+		mesh = self.__read_entry(key)
+		if mesh is None:
+			def parse_progress(stage, stages):
+				progress(stat.st_size + stat.st_size*stage//stages, 2*stat.st_size)
+
+			mesh = obj_files_handler.build_object(*obj_files_handler.parse_obj(
+				data.decode(errors='replace'), parse_progress if progress is not None else None, cancel
+			))
+			if cancel is not None and cancel.is_set():
+				raise obj_files_handler.LoadCancelled()
+			self.__write_entry(key, mesh)
+			mesh = self.__read_entry(key)
+		elif progress is not None:
+			progress(stat.st_size, stat.st_size)
+		self.__write_index()
+		return mesh.triangulate() if triangulate else mesh
+
+	def invalidate(self, file_path: str) -> None:
+		'''Drop the cached mesh of a file'''
+		known = self._index['files'].pop(os.path.abspath(file_path), None)
+		if known:
+			self.__remove_entry(known['hash'])
+		self.__write_index()
+
+	def clear(self) -> None:
+		'''Drop every cached mesh'''
+		for key in list(self._index['entries']):
+			self.__remove_entry(key)
+		self._index = {'files': {}, 'entries': {}}
+		self.__write_index()
+
+	def __len__(self) -> int:
+		'''Number of cached meshes'''
+		return len(self._index['entries'])
+
+	@property
+	def directory(self) -> str:
+		'''Folder holding the cache entries'''
+		return self._dir
+
+	@property
+	def size(self) -> int:
+		'''Total size of the cached entries in bytes'''
+		return sum(entry['bytes'] for entry in self._index['entries'].values())
+
+	def __read_entry(self, key: str) -> Mesh:
+		'''Memory-map the mesh of an entry, None if it's not (or no more) cached'''
+		entry = self._index['entries'].get(key)
+		if entry is None:
+			return None
+		try:
+			arrays = tuple(np.load(os.path.join(self._dir, key, f'{name}.npy'), mmap_mode='r') for name in self.ARRAYS)
+		except (OSError, ValueError):
+			self.__remove_entry(key)
+			return None
+		entry['last_used'] = time.time()
+		return Mesh(*arrays)
+
+	def __write_entry(self, key: str, mesh: Mesh) -> None:
+		'''Store the arrays of a parsed mesh, then evict entries beyond the size cap'''
+		# Stored exactly as the Mesh holds them, so they are used straight from the memory map
+		compact = (mesh.verticies, mesh.indices, mesh.offsets)
+		tmp_dir = os.path.join(self._dir, f'.{key}.tmp')
+		os.makedirs(tmp_dir, exist_ok=True)
+		for name, array in zip(self.ARRAYS, compact):
+			np.save(os.path.join(tmp_dir, f'{name}.npy'), array)
+		shutil.rmtree(os.path.join(self._dir, key), ignore_errors=True)
+		os.replace(tmp_dir, os.path.join(self._dir, key))
+
+		self._index['entries'][key] = {'bytes': sum(array.nbytes for array in compact), 'last_used': time.time()}
+		self.__evict(keep=key)
+
+	def __evict(self, keep: str) -> None:
+		'''Remove the least recently used entries until the cache fits in its size cap'''
+		by_age = sorted(self._index['entries'].items(), key=lambda item: item[1]['last_used'])
+		total = self.size
+		for key, entry in by_age:
+			if total <= self._max_bytes:
+				break
+			if key != keep:
+				total -= entry['bytes']
+				self.__remove_entry(key)
+
+	def __remove_entry(self, key: str) -> None:
+		self._index['entries'].pop(key, None)
+		self._index['files'] = {path: known for path, known in self._index['files'].items() if known['hash'] != key}
+		shutil.rmtree(os.path.join(self._dir, key), ignore_errors=True)
+
+	def __read_index(self) -> dict:
+		try:
+			with open(os.path.join(self._dir, self.INDEX_FILE)) as file:
+				index = json.load(file)
+			if 'files' in index and 'entries' in index:
+				return index
+		except (OSError, ValueError):
+			pass
+		return {'files': {}, 'entries': {}}
+
+	def __write_index(self) -> None:
+		tmp_path = os.path.join(self._dir, f'.{self.INDEX_FILE}.tmp')
+		with open(tmp_path, 'w') as file:
+			json.dump(self._index, file)
+		os.replace(tmp_path, os.path.join(self._dir, self.INDEX_FILE))
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Manage the parsed meshes cache')
+	parser.add_argument('--dir', default=None, help=f'Cache folder (default: {MeshCache.DEFAULT_DIR})')
+	parser.add_argument('--clear', action='store_true', help='Drop every cached mesh')
+	parser.add_argument('--invalidate', nargs='*', default=[], metavar='OBJ', help='Drop the cached mesh of these files')
+	args = parser.parse_args()
+
+	cache = MeshCache(args.dir)
+	for path in args.invalidate:
+		cache.invalidate(path)
+	if args.clear:
+		cache.clear()
+	print(f'{len(cache)} cached meshes, {cache.size/2**20:.1f}MB in {cache.directory}')
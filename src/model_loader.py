@@ -0,0 +1,69 @@
+from obj_files_handler import LoadCancelled
+
+import queue
+import typing
+import threading
+
+if typing.TYPE_CHECKING:
+	from mesh_cache import MeshCache
+
+class ModelLoader:
+	'''
+	Loads .obj files on a worker thread so that the GUI stays responsive.
+	The worker never touches Tk, it posts its events to a queue that the GUI polls:
+		('progress', fraction), ('done', mesh), ('error', exception), ('cancelled', None)
+	'''
+	def __init__(self, mesh_cache: 'MeshCache') -> None:
+		self._mesh_cache = mesh_cache
+		self._events = queue.Queue()
+		self._cancel = None
+		self._worker = None
+		self._lock = threading.Lock() # The cache is only used by one worker at a time
+
+	def start(self, file_path: str, triangulate: bool = False) -> None:
+		'''
+		@brief: Start loading a file in the background, cancelling the ongoing load if any
+		@param triangulate: Also triangulate the faces of the mesh (see Mesh.triangulate)
+		'''
+		self.cancel()
+		self._cancel = threading.Event()
+		self._worker = threading.Thread(target=self.__load, args=(file_path, self._cancel, triangulate), daemon=True)
+		self._worker.start()
+
+	def cancel(self) -> None:
+		'''Abort the ongoing load (its 'cancelled' event is still posted)'''
+		if self._cancel is not None:
+			self._cancel.set()
+
+	@property
+	def busy(self) -> bool:
+		'''Whether the worker of the last load is still running (it might be winding down after a cancel)'''
+		return self._worker is not None and self._worker.is_alive()
+
+	def poll(self) -> 'list(tuple(str, object))':
+		'''Get the events posted since the last poll, events of replaced loads are dropped'''
+		events = []
+		while True:
+			try:
+				cancel, event = self._events.get_nowait()
+			except queue.Empty:
+				return events
+			if cancel is self._cancel:
+				events.append(event)
+
+	def __load(self, file_path: str, cancel: threading.Event, triangulate: bool) -> None:
+		'''Worker thread body'''
+		def progress(bytes_read, total):
+			self._events.put((cancel, ('progress', bytes_read/total if total else 1.0)))
+
+		try:
+			with self._lock:
+				mesh = self._mesh_cache.extract_data(file_path, progress=progress, cancel=cancel, triangulate=triangulate)
+			if cancel.is_set():
+				raise LoadCancelled()
+		except LoadCancelled:
+			self._events.put((cancel, ('cancelled', None)))
+		except Exception as e:
+			self._events.put((cancel, ('error', e)))
+		else:
+			self._events.put((cancel, ('done', mesh)))
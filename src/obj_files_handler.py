@@ -1,22 +1,136 @@
 #! /usr/bin/env python3
+from timer import profiler
+from mesh import Mesh
 import re
 
 import numpy as np
 
-def extract_data(file):
+VERTEX_PREFIXES = ("v ", "v\t")
+FACE_PREFIXES = ("f ", "f\t")
+
+# Everything that follows the vertex index in a face element (v/vt/vn, v//vn, v/vt)
+_FACE_ELEMENT_TAIL = re.compile(r"/\S*")
+
+READ_CHUNK_SIZE = 1 << 22 # 4MB
+PARSE_STAGES = 4 # Split into lines, sort the lines, parse the verticies, parse the faces
+
+
+class LoadCancelled(Exception):
+    """Raised when the loading of a file gets cancelled midway"""
+
+
+def read_in_chunks(file, total=None, progress=None, cancel=None, chunk_size=READ_CHUNK_SIZE):
     """
-    @brief: This function takes in a .obj file and returns a list containing
-            the indexes of the vertexes that make up the face, and a dict
-            that contains the index of the vertex, along with its coordinates
+    @brief: Read a whole (binary) file chunk by chunk, reporting the progress
 
-    @param: .obj file
+    @param: file (file opened in binary mode)
+    @param: total (size of the file in bytes, only forwarded to progress)
+    @param: progress (optional callable(bytes_read, total) called after every chunk)
+    @param: cancel (optional threading.Event, LoadCancelled is raised once it's set)
+
+    @ret  : data (the content of the file, as bytes)
+    """
 
-    @ret  : verticies (the dict containing coordinates)
-    @ret  : faces (the list containing the vertexes' indexes)
+    chunks = []
+    bytes_read = 0
+    while True:
+        if cancel is not None and cancel.is_set():
+            raise LoadCancelled()
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        bytes_read += len(chunk)
+        if progress is not None:
+            progress(bytes_read, total)
+    return b"".join(chunks)
+
+
+@profiler.timed('parse')
+def parse_obj(data, progress=None, cancel=None):
     """
+    @brief: Parse the content of a .obj file in bulk (linear in the file size)
+
+    @param: data (the whole content of the .obj file, as a str)
+    @param: progress (optional callable(stages_done, PARSE_STAGES) called after every stage)
+    @param: cancel (optional threading.Event, checked between the stages: LoadCancelled is raised once it's set)
+
+    @ret  : verticies ((N, 3) float array, the i-th row is the vertex of index i+1)
+    @ret  : indices (flat int array of the 1-based vertex indices of all faces,
+            relative (negative) indices already resolved)
+    @ret  : sizes (int array, the number of verticies in each face)
+
+    Raises ValueError on malformed verticies or faces (unparsable values, indices out of range)
+    """
+
+    def stage_done(stage):
+        if progress is not None:
+            progress(stage, PARSE_STAGES)
+        if cancel is not None and cancel.is_set():
+            raise LoadCancelled()
+
+    lines = data.splitlines()
+    stage_done(1)
+    vertex_lines = _strip_comments([line[2:] for line in lines if line.startswith(VERTEX_PREFIXES)])
+    face_lines = _strip_comments([line[2:] for line in lines if line.startswith(FACE_PREFIXES)])
+    stage_done(2)
+
+    verticies = _parse_verticies(vertex_lines)
+    stage_done(3)
 
-    verticies = np.empty((1, 3))
-    faces = []
+    # Only keep the vertex index of every face element, then parse all of them at once
+    rows = _FACE_ELEMENT_TAIL.sub("", "\n".join(face_lines)).split("\n") if face_lines else []
+    sizes = np.fromiter((len(row.split()) for row in rows), dtype=np.int64, count=len(rows))
+    indices = np.fromstring(" ".join(rows), dtype=np.int64, sep=" ") if rows else np.empty(0, dtype=np.int64)
+    if indices.size != sizes.sum():
+        # A token that isn't an integer stops the bulk parsing early
+        raise ValueError(f"Malformed faces: {sizes.sum()} vertex indices expected, {indices.size} parsed")
+
+    if indices.size and indices.min() < 0:
+        # A negative index is relative to the number of verticies defined before the face
+        is_vertex = np.fromiter((line.startswith(VERTEX_PREFIXES) for line in lines), dtype=bool, count=len(lines))
+        is_face = np.fromiter((line.startswith(FACE_PREFIXES) for line in lines), dtype=bool, count=len(lines))
+        defined = np.repeat(np.cumsum(is_vertex)[is_face], sizes)
+        indices = np.where(indices < 0, defined + 1 + indices, indices)
+    if indices.size and (indices.min() < 1 or indices.max() > len(verticies)):
+        raise ValueError(f"Faces reference verticies outside of the {len(verticies)} defined ones")
+    stage_done(4)
+
+    return verticies, indices, sizes
+
+
+def _strip_comments(lines):
+    """Drop the inline "# comment" at the end of the lines, they would stop the bulk parsing"""
+    if not any("#" in line for line in lines):
+        return lines
+    return [line.partition("#")[0] for line in lines]
+
+
+def _parse_verticies(vertex_lines):
+    """Parse the "v x y z [w]" lines into an (N, 3) float array"""
+    if not vertex_lines:
+        return np.empty((0, 3))
+    coords = np.fromstring(" ".join(vertex_lines), sep=" ")
+    if coords.size == 3 * len(vertex_lines):
+        return coords.reshape((-1, 3))
+    # Some verticies carry a w component or a color, only keep x, y, z
+    rows = [line.split()[:3] for line in vertex_lines]
+    if any(len(row) != 3 for row in rows):
+        raise ValueError(f"Malformed verticies: {sum(len(row) != 3 for row in rows)} of {len(rows)} have less than 3 coordinates")
+    return np.array(rows, dtype=np.float64)
+
+
+def extract_data(file, triangulate=False):
+    """
+    @brief: This function takes in a .obj file and returns the mesh it describes:
+            the coordinates of each vertex, and the indexes of the vertexes that
+            make up each face
+
+    @param: .obj file
+    @param: triangulate (also fan-triangulate the faces, see Mesh.triangulate)
+
+    @ret  : mesh (Mesh, float32 verticies and 0-based face indices in CSR layout)
+    """
 
     # Read more about how waveform (.obj) files are structured to understand
     # how this code exactly works, but shortly:
@@ -26,13 +140,17 @@ def extract_data(file):
     #     the list of verticies to be connected to create a face
     #     (formatted a bit strangely though, I recommend checking an example)
 
-    for line in file.readlines():
-        if line[0:2] == "v ":
-            pt = np.array([[float(x) for x in re.findall("[-+]?[.]?[\d]+(?:,\d\d\d)*[\.]?\d*(?:[eE][-+]?\d+)?", line)]])
-            verticies = np.concatenate([verticies, pt])
-        elif line[0:2] == "f ":
-            faces.append([int(vertex.split("/")[0]) for vertex in line[2:-2].split(' ')])
-    return verticies, faces
+    return build_object(*parse_obj(file.read()), triangulate=triangulate)
+
+
+def build_object(verticies, indices, sizes, triangulate=False):
+    """
+    @brief: Turn the output of parse_obj into the Mesh that Geometry.upload_object
+            expects (see extract_data)
+    """
+    # .obj indices start at 1
+    mesh = Mesh.from_sizes(verticies, indices - 1, sizes)
+    return mesh.triangulate() if triangulate else mesh
 
 
 if __name__ == '__main__':
@@ -0,0 +1,101 @@
+'''
+Off-screen rendering (no Tk): draws a Geometry into an RGB image with the software rasterizer
+'''
+from rasterizer import Rasterizer, hex_to_rgb
+
+import zlib
+import struct
+import typing
+import numpy as np
+
+if typing.TYPE_CHECKING:
+	from geometry import Geometry
+
+MIN_FACE_AREA = 1 # Faces are only dropped when completely off the image, small images need their small faces
+
+def write_png(path: str, frame: np.ndarray) -> None:
+	'''
+	@brief: Save an RGB image as a PNG file (from scratch, no imaging library needed)
+	@param path: Destination file
+	@param frame: (H, W, 3) uint8 image
+	'''
+	h, w = frame.shape[:2]
+	# Every row starts with its filter type (0: none)
+	rows = np.concatenate((np.zeros((h, 1), dtype=np.uint8), np.ascontiguousarray(frame, dtype=np.uint8).reshape((h, w*3))), axis=1)
+
+	def chunk(kind: bytes, data: bytes) -> bytes:
+		return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+	with open(path, 'wb') as file:
+		file.write(b'\x89PNG\r\n\x1a\n')
+		file.write(chunk(b'IHDR', struct.pack('>IIBBBBB', w, h, 8, 2, 0, 0, 0)))
+		file.write(chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)))
+		file.write(chunk(b'IEND', b''))
+
+def fit_view(geometry: 'Geometry', width: int, height: int, margin: float = 0.05) -> None:
+	'''
+	@brief: Scale and center the object, in its current pose, so that it fills the image
+	@param margin: Empty border left on each side, relative to the image size
+	'''
+	geometry.set_object_scale(geometry.OBJECT_SCALE)
+	geometry.set_position(0, 0)
+	points = geometry.transform_object()
+	low, high = points.min(axis=0), points.max(axis=0)
+	span = np.maximum(high - low, 1)
+	ratio = min(width*(1 - 2*margin)/span[0], height*(1 - 2*margin)/span[1])
+	geometry.set_object_scale(geometry.OBJECT_SCALE*ratio)
+	center = (low + high)/2*ratio
+	geometry.set_position(int(width/2 - center[0]), int(height/2 - center[1]))
+
+def render_view(geometry: 'Geometry',
+				width: int,
+				height: int,
+				fill: str = '#000000',
+				line: str = '#0000FF',
+				background: str = '#FFFFFF',
+				cull_back_faces: bool = False,
+				wireframe: bool = False,
+				rasterizer: Rasterizer = None
+) -> np.ndarray:
+	'''
+	@brief: Render the object in its current pose (orientation, zoom, position, scale)
+	@param fill: Fill color ('#RRGGBB'), empty for no fill
+	@param rasterizer: Reused between calls if given (its framebuffer is resized as needed)
+	@return frame: (height, width, 3) RGB image (a copy, safe to keep)
+	'''
+	rasterizer = rasterizer or Rasterizer(width, height)
+	rasterizer.resize(width, height)
+	points = geometry.transform_object()
+	if wireframe:
+		return rasterizer.render_wireframe(geometry, points, line, background).copy()
+	face_ids = geometry.visible_faces(points, cull_back_faces, (width, height), MIN_FACE_AREA)
+	return rasterizer.render(geometry, points, face_ids, fill, line, background).copy()
+
+def render_scaled(geometry: 'Geometry', canvas_size: 'tuple(int, int)', width: int, **kwargs) -> np.ndarray:
+	'''
+	@brief: Render the view shown on a canvas at another resolution (the aspect ratio is kept)
+	@param canvas_size: (width, height) of the canvas the geometry is placed on
+	@param width: Width of the rendered image
+	@param kwargs: See render_view
+	'''
+	ratio = width/canvas_size[0]
+	height = max(int(round(canvas_size[1]*ratio)), 1)
+	position, scale = geometry.position, geometry.object_scale
+	geometry.set_position(int(position[0]*ratio), int(position[1]*ratio))
+	geometry.set_object_scale(scale*ratio)
+	try:
+		return render_view(geometry, width, height, **kwargs)
+	finally:
+		geometry.set_position(*position)
+		geometry.set_object_scale(scale)
+
+def contact_sheet(frames: 'list(np.ndarray)', columns: int, background: str = '#FFFFFF') -> np.ndarray:
+	'''Tile same-sized images into a grid, row by row'''
+	h, w = frames[0].shape[:2]
+	rows = -(-len(frames)//columns)
+	sheet = np.empty((rows*h, columns*w, 3), dtype=np.uint8)
+	sheet[:] = hex_to_rgb(background)
+	for i, frame in enumerate(frames):
+		r, c = divmod(i, columns)
+		sheet[r*h:(r + 1)*h, c*w:(c + 1)*w] = frame
+	return sheet
@@ -0,0 +1,162 @@
+import math
+import numpy as np
+import numba
+
+@numba.njit(nogil=True, cache=True)
+def build_grid(points: np.ndarray,
+			   face_indices: np.ndarray,
+			   face_starts: np.ndarray,
+			   face_sizes: np.ndarray,
+			   face_ids: np.ndarray,
+			   cell: int,
+			   columns: int,
+			   rows: int
+) -> 'tuple(np.ndarray, np.ndarray)':
+	'''
+	@brief: Bin the screen-space bounding boxes of the faces into a uniform grid
+	@param points: (N, 2) projected points
+	@param face_indices, face_starts, face_sizes: Flat layout of the faces (see Geometry.face_layout)
+	@param face_ids: Faces to bin, in drawing order
+	@param cell: Size of the (square) cells in pixels, the grid starts at (0, 0)
+	@return cell_starts, cell_faces: CSR lists of the faces whose box overlaps every cell (row by row),
+			in drawing order
+	'''
+	n = len(face_ids)
+	ranges = np.empty((n, 4), dtype=np.int64) # First and last column and row covered by every face
+	counts = np.zeros(columns*rows + 1, dtype=np.int64)
+	for k in range(n):
+		face = face_ids[k]
+		start, size = face_starts[face], face_sizes[face]
+		ranges[k, 0], ranges[k, 1], ranges[k, 2], ranges[k, 3] = 0, 0, -1, -1 # Covers nothing until proven otherwise
+		if size == 0:
+			continue
+		x0 = x1 = points[face_indices[start], 0]
+		y0 = y1 = points[face_indices[start], 1]
+		for j in range(start + 1, start + size):
+			x, y = points[face_indices[j], 0], points[face_indices[j], 1]
+			x0, x1 = min(x0, x), max(x1, x)
+			y0, y1 = min(y0, y), max(y1, y)
+		if x1 < 0 or y1 < 0 or x0 >= columns*cell or y0 >= rows*cell:
+			continue
+		c0, c1 = max(x0//cell, 0), min(x1//cell, columns - 1)
+		r0, r1 = max(y0//cell, 0), min(y1//cell, rows - 1)
+		ranges[k, 0], ranges[k, 1], ranges[k, 2], ranges[k, 3] = c0, r0, c1, r1
+		for r in range(r0, r1 + 1):
+			for c in range(c0, c1 + 1):
+				counts[r*columns + c + 1] += 1
+
+	cell_starts = np.cumsum(counts)
+	cell_faces = np.empty(cell_starts[-1], dtype=np.int32)
+	cursor = cell_starts[:-1].copy()
+	for k in range(n):
+		for r in range(ranges[k, 1], ranges[k, 3] + 1):
+			for c in range(ranges[k, 0], ranges[k, 2] + 1):
+				i = r*columns + c
+				cell_faces[cursor[i]] = face_ids[k]
+				cursor[i] += 1
+	return cell_starts, cell_faces
+
+@numba.njit(nogil=True, cache=True)
+def pick_face(x: int,
+			  y: int,
+			  points: np.ndarray,
+			  face_indices: np.ndarray,
+			  face_starts: np.ndarray,
+			  face_sizes: np.ndarray,
+			  cell_starts: np.ndarray,
+			  cell_faces: np.ndarray,
+			  cell: int,
+			  columns: int,
+			  rows: int,
+			  z: np.ndarray
+) -> int:
+	'''
+	@brief: Find the face under a point, only testing the faces binned in its cell
+	@param z: (N,) depth of every point (the larger, the closer), the closest face wins.
+			  Empty to pick the last drawn one instead (the one on top on the canvas)
+	@return face: -1 if there is none
+	'''
+	c, r = x//cell, y//cell
+	if c < 0 or r < 0 or c >= columns or r >= rows:
+		return -1
+	best, best_depth = -1, -np.inf
+	i = r*columns + c
+	for k in range(cell_starts[i], cell_starts[i + 1]):
+		face = cell_faces[k]
+		start, size = face_starts[face], face_sizes[face]
+		# Even-odd rule, the crossings of a ray going right from the point
+		inside = False
+		depth = 0.0
+		for j in range(size):
+			a, b = face_indices[start + j], face_indices[start + (j + 1) % size]
+			ax, ay, bx, by = points[a, 0], points[a, 1], points[b, 0], points[b, 1]
+			if (ay > y) != (by > y) and x < ax + (y - ay)*(bx - ax)/(by - ay):
+				inside = not inside
+			if len(z):
+				depth += z[a]
+		if not inside:
+			continue
+		if len(z) == 0:
+			best = face
+		elif depth/size >= best_depth:
+			best, best_depth = face, depth/size
+	return best
+
+class PickIndex:
+	'''
+	Screen-space uniform grid over the bounding boxes of the drawn faces, for mouse picking.
+	A pick only tests the few faces binned in the cell under the cursor, so it doesn't get slower
+	with the size of the mesh. Build a new one whenever the projected points change
+	'''
+	FACES_PER_CELL = 4 # The cells are sized for about that many boxes each
+	MIN_CELL = 4 # Cell size bounds, in pixels
+	MAX_CELL = 64
+
+	def __init__(self,
+				 points: np.ndarray,
+				 face_layout: 'tuple(np.ndarray, np.ndarray, np.ndarray)',
+				 face_ids: np.ndarray,
+				 viewport: 'tuple(int, int)'
+	) -> None:
+		'''
+		@param points: (N, 2) projected points (kept, not copied)
+		@param face_layout: (indices, starts, sizes) of the faces (see Geometry.face_layout)
+		@param face_ids: Faces that can be picked, in drawing order
+		@param viewport: (width, height) of the canvas, the area the grid covers
+		'''
+		self._points = points
+		self._layout = face_layout
+		width, height = max(int(viewport[0]), 1), max(int(viewport[1]), 1)
+		cell = math.sqrt(width*height*self.FACES_PER_CELL/max(len(face_ids), 1))
+		self._cell = int(min(max(cell, self.MIN_CELL), self.MAX_CELL))
+		self._columns = -(-width//self._cell)
+		self._rows = -(-height//self._cell)
+		self._cell_starts, self._cell_faces = build_grid(
+			points, *face_layout, np.ascontiguousarray(face_ids, dtype=np.int64), self._cell, self._columns, self._rows
+		)
+
+	@property
+	def cell_size(self) -> int:
+		return self._cell
+
+	@property
+	def cell_count(self) -> int:
+		return self._columns*self._rows
+
+	def pick(self, x: int, y: int, z: np.ndarray = None) -> int:
+		'''
+		@brief: Face under a point of the canvas (-1 if none)
+		@param z: (N,) depth of every point (the larger, the closer) to pick the closest face,
+				  the last drawn one is picked otherwise
+		'''
+		return int(pick_face(
+			int(x), int(y), self._points, *self._layout, self._cell_starts, self._cell_faces,
+			self._cell, self._columns, self._rows, np.empty(0) if z is None else z
+		))
+
+	def nearest_corner(self, face: int, x: int, y: int) -> int:
+		'''Vertex of a face closest to a point of the canvas'''
+		indices, starts, sizes = self._layout
+		corners = indices[starts[face]:starts[face] + sizes[face]]
+		offsets = self._points[corners] - (x, y)
+		return int(corners[np.argmin(np.einsum('ij,ij->i', offsets, offsets))])
@@ -0,0 +1,114 @@
+from geometry import start_threads
+
+import threading
+import typing
+import collections
+
+if typing.TYPE_CHECKING:
+	import numpy as np
+	from geometry import Geometry
+
+class PlaybackBuffer:
+	'''
+	Continuous rotation playback. The orientation steps by a fixed angle every frame, so the upcoming frames are
+	known in advance: a worker thread projects them ahead into a bounded ring, and the render loop only takes them out.
+	Any other change of the pose makes them stale, flush() drops them and idles the worker until the next start()
+	'''
+	def __init__(self, capacity: int = 8) -> None:
+		'''
+		@param capacity: Frames projected ahead at most (each one holds an (N, 2) array, and the (N, 3) rotated verticies if kept)
+		'''
+		self._capacity = max(int(capacity), 1)
+		self._frames = collections.deque() # (orientation, points, position, rotated) ready to be drawn
+		self._condition = threading.Condition()
+		self._generation = 0 # Bumped by every flush, frames projected for an older generation are dropped
+		self._playback = None # (projector, first orientation, position, step, keep rotated) of the running playback
+		self._scheduled = 0 # Frames of the running playback handed to the worker so far
+		self._worker = None
+		self._closed = False
+
+	def start(self, geometry: 'Geometry', step: 'tuple(float, float, float)', keep_rotated: bool = True) -> None:
+		'''
+		@brief: Start projecting the frames that follow the current pose of the geometry (flushing the previous ones).
+				Call it from the main thread
+		@param step: Angles added to the orientation every frame
+		@param keep_rotated: Also keep the rotated verticies of every frame (for the back-face culling and the raster depth)
+		'''
+		projector, orientation, position = geometry.projector(), geometry.orientation, geometry.position
+		with self._condition:
+			self.__flush()
+			self._playback = (projector, orientation, position, tuple(step), keep_rotated)
+			self._condition.notify_all()
+		if self._worker is None:
+			start_threads()
+			self._worker = threading.Thread(target=self.__run, daemon=True)
+			self._worker.start()
+
+	def close(self) -> None:
+		'''Stop the worker thread, once it's done with the frame it's projecting (call it before exiting)'''
+		with self._condition:
+			self.__flush()
+			self._closed = True
+			self._condition.notify_all()
+		if self._worker is not None:
+			self._worker.join()
+			self._worker = None
+
+	def flush(self) -> None:
+		'''Drop the frames projected ahead and stop projecting new ones'''
+		with self._condition:
+			self.__flush()
+
+	def __flush(self) -> None:
+		self._generation += 1
+		self._frames.clear()
+		self._playback = None
+		self._scheduled = 0
+
+	@property
+	def running(self) -> bool:
+		'''Whether frames are being projected for a playback (since the last start, until the next flush)'''
+		return self._playback is not None
+
+	@property
+	def step(self) -> 'tuple(float, float, float)':
+		'''Step of the running playback (None if there is none)'''
+		playback = self._playback
+		return None if playback is None else playback[3]
+
+	@property
+	def buffered(self) -> int:
+		'''Frames ready to be drawn'''
+		return len(self._frames)
+
+	def take(self) -> 'tuple(tuple, np.ndarray, tuple, np.ndarray)':
+		'''
+		@brief: Next frame of the playback, without waiting
+		@return: (orientation, points, position, rotated), None if it isn't projected yet.
+				 The points are projected at that position (the pose at start()), rotated is None if not kept
+		'''
+		with self._condition:
+			if not self._frames:
+				return None
+			frame = self._frames.popleft()
+			self._condition.notify_all()
+			return frame
+
+	def __run(self) -> None:
+		'''Worker thread body: keep the ring full for the running playback'''
+		while True:
+			with self._condition:
+				while not self._closed and (self._playback is None or len(self._frames) >= self._capacity):
+					self._condition.wait()
+				if self._closed:
+					return
+				generation = self._generation
+				projector, first, position, step, keep_rotated = self._playback
+				self._scheduled += 1
+				index = self._scheduled
+			# The projection itself runs outside of the lock, the render loop can take the frames ready meanwhile
+			orientation = tuple(angle + index*delta for angle, delta in zip(first, step))
+			points, rotated = projector(*orientation)
+			with self._condition:
+				if generation == self._generation:
+					self._frames.append((orientation, points, position, rotated if keep_rotated else None))
@@ -0,0 +1,264 @@
+import typing
+import numpy as np
+import numba
+
+if typing.TYPE_CHECKING:
+	from geometry import Geometry
+
+DEPTH_BIAS = 1e-2 # Lets the outlines win the depth test against the faces they border
+
+@numba.njit(nogil=True, cache=True)
+def fill_triangle(frame: np.ndarray,
+				  depth: np.ndarray,
+				  points: np.ndarray,
+				  z: np.ndarray,
+				  a: int, b: int, c: int,
+				  color: np.ndarray
+) -> None:
+	'''
+	@brief: Fill a projected triangle, keeping the closest surface of every pixel
+	@param frame: (H, W, 3) RGB framebuffer
+	@param depth: (H, W) z-buffer (the larger, the closer to the viewer)
+	@param points: (N, 2) projected points
+	@param z: (N,) depth of every point
+	@param a, b, c: Indices of the triangle's corners
+	@param color: RGB fill color
+	'''
+	h, w = depth.shape
+	ax, ay = points[a, 0], points[a, 1]
+	bx, by = points[b, 0], points[b, 1]
+	cx, cy = points[c, 0], points[c, 1]
+	area = (bx - ax)*(cy - ay) - (cx - ax)*(by - ay)
+	if area == 0:
+		return
+
+	x0 = max(min(ax, bx, cx), 0)
+	x1 = min(max(ax, bx, cx), w - 1)
+	y0 = max(min(ay, by, cy), 0)
+	y1 = min(max(ay, by, cy), h - 1)
+	for y in range(y0, y1 + 1):
+		for x in range(x0, x1 + 1):
+			# Barycentric weights, all of the same sign as the area when inside the triangle
+			wa = (bx - x)*(cy - y) - (cx - x)*(by - y)
+			wb = (cx - x)*(ay - y) - (ax - x)*(cy - y)
+			wc = (ax - x)*(by - y) - (bx - x)*(ay - y)
+			if area > 0:
+				if wa < 0 or wb < 0 or wc < 0:
+					continue
+			elif wa > 0 or wb > 0 or wc > 0:
+				continue
+			d = (wa*z[a] + wb*z[b] + wc*z[c])/area
+			if d > depth[y, x]:
+				depth[y, x] = d
+				frame[y, x, 0] = color[0]
+				frame[y, x, 1] = color[1]
+				frame[y, x, 2] = color[2]
+
+@numba.njit(nogil=True, cache=True)
+def draw_line(frame: np.ndarray,
+			  depth: np.ndarray,
+			  points: np.ndarray,
+			  z: np.ndarray,
+			  a: int, b: int,
+			  color: np.ndarray,
+			  depth_test: bool
+) -> None:
+	'''
+	@brief: Draw the segment between two projected points (Bresenham)
+	@param depth_test: Only draw the pixels that aren't behind an already drawn surface
+	'''
+	h, w = depth.shape
+	x, y = points[a, 0], points[a, 1]
+	x1, y1 = points[b, 0], points[b, 1]
+	dx, dy = abs(x1 - x), -abs(y1 - y)
+	sx = 1 if x < x1 else -1
+	sy = 1 if y < y1 else -1
+	err = dx + dy
+	steps = max(dx, -dy)
+	for i in range(steps + 1):
+		if 0 <= x < w and 0 <= y < h:
+			d = z[a] + (z[b] - z[a])*(i/steps if steps else 0.0)
+			if not depth_test or d + DEPTH_BIAS >= depth[y, x]:
+				frame[y, x, 0] = color[0]
+				frame[y, x, 1] = color[1]
+				frame[y, x, 2] = color[2]
+		e2 = 2*err
+		if e2 >= dy:
+			err += dy
+			x += sx
+		if e2 <= dx:
+			err += dx
+			y += sy
+
+@numba.njit(nogil=True, cache=True)
+def draw_outlines(frame: np.ndarray,
+				  depth: np.ndarray,
+				  points: np.ndarray,
+				  z: np.ndarray,
+				  face_indices: np.ndarray,
+				  face_starts: np.ndarray,
+				  face_sizes: np.ndarray,
+				  face_ids: np.ndarray,
+				  line: np.ndarray,
+				  depth_test: bool
+) -> None:
+	'''
+	@brief: Draw the outlines of the requested faces (the source polygons)
+	@param face_indices, face_starts, face_sizes: Flat layout of the faces (see Geometry.face_layout)
+	@param face_ids: Indices of the faces to draw
+	'''
+	for f in face_ids:
+		start, size = face_starts[f], face_sizes[f]
+		for k in range(size):
+			draw_line(frame, depth, points, z, face_indices[start + k], face_indices[start + (k + 1)%size], line, depth_test)
+
+@numba.njit(nogil=True, cache=True)
+def draw_faces(frame: np.ndarray,
+			   depth: np.ndarray,
+			   points: np.ndarray,
+			   z: np.ndarray,
+			   face_indices: np.ndarray,
+			   face_starts: np.ndarray,
+			   face_sizes: np.ndarray,
+			   face_ids: np.ndarray,
+			   fill: np.ndarray,
+			   line: np.ndarray,
+			   filled: bool
+) -> None:
+	'''
+	@brief: Draw the requested faces: fan-triangulated fill first, then their outlines
+	@param face_indices, face_starts, face_sizes: Flat layout of the faces (see Geometry.face_layout)
+	@param face_ids: Indices of the faces to draw
+	@param filled: Fill the faces, when not filled every outline is drawn (no depth test)
+	'''
+	if filled:
+		for f in face_ids:
+			start = face_starts[f]
+			for k in range(1, face_sizes[f] - 1):
+				fill_triangle(frame, depth, points, z, face_indices[start], face_indices[start + k], face_indices[start + k + 1], fill)
+	draw_outlines(frame, depth, points, z, face_indices, face_starts, face_sizes, face_ids, line, filled)
+
+@numba.njit(nogil=True, cache=True)
+def fill_triangles(frame: np.ndarray,
+				   depth: np.ndarray,
+				   points: np.ndarray,
+				   z: np.ndarray,
+				   triangles: np.ndarray,
+				   triangle_offsets: np.ndarray,
+				   face_ids: np.ndarray,
+				   fill: np.ndarray
+) -> None:
+	'''
+	@brief: Fill the requested faces from their load-time triangulation
+	@param triangles, triangle_offsets: (T, 3) triangles and the first triangle of every face (see Geometry.triangles)
+	@param face_ids: Indices of the faces to fill
+	'''
+	for f in face_ids:
+		for t in range(triangle_offsets[f], triangle_offsets[f + 1]):
+			fill_triangle(frame, depth, points, z, triangles[t, 0], triangles[t, 1], triangles[t, 2], fill)
+
+@numba.njit(nogil=True, cache=True)
+def draw_edges(frame: np.ndarray,
+			   depth: np.ndarray,
+			   points: np.ndarray,
+			   z: np.ndarray,
+			   edges: np.ndarray,
+			   line: np.ndarray
+) -> None:
+	'''
+	@brief: Draw a line list (every edge once, no depth test)
+	@param edges: (E, 2) vertex indices of the edges
+	'''
+	for e in range(edges.shape[0]):
+		draw_line(frame, depth, points, z, edges[e, 0], edges[e, 1], line, False)
+
+def hex_to_rgb(color: str) -> np.ndarray:
+	'''Convert a '#RRGGBB' color into an RGB array'''
+	color = color.lstrip('#')
+	return np.array([int(color[i:i + 2], 16) for i in (0, 2, 4)], dtype=np.uint8)
+
+class Rasterizer:
+	'''
+	Software renderer: rasterizes the projected faces of a Geometry into a NumPy RGB framebuffer,
+	the cost grows with the framebuffer size rather than with the number of faces
+	'''
+	def __init__(self, width: int, height: int) -> None:
+		self.resize(width, height)
+
+	def resize(self, width: int, height: int) -> None:
+		'''Change the framebuffer size (no-op if unchanged)'''
+		width, height = max(int(width), 1), max(int(height), 1)
+		if getattr(self, '_frame', None) is not None and self._frame.shape[:2] == (height, width):
+			return
+		self._frame = np.zeros((height, width, 3), dtype=np.uint8)
+		self._depth = np.empty((height, width))
+
+	@property
+	def frame(self) -> np.ndarray:
+		'''(H, W, 3) RGB framebuffer of the last render'''
+		return self._frame
+
+	def render(self,
+			   geometry: 'Geometry',
+			   points: np.ndarray,
+			   face_ids: np.ndarray,
+			   fill: str,
+			   line: str,
+			   background: str
+	) -> np.ndarray:
+		'''
+		@brief: Draw a frame
+		@param geometry: Geometry whose last transform produced the points
+		@param points: (N, 2) projected points
+		@param face_ids: Indices of the faces to draw (see Geometry.visible_faces)
+		@param fill: Fill color ('#RRGGBB'), empty for no fill
+		@param line: Outline color ('#RRGGBB')
+		@param background: Background color ('#RRGGBB')
+		@return frame: The (H, W, 3) RGB framebuffer
+		'''
+		self._frame[:] = hex_to_rgb(background)
+		self._depth.fill(-np.inf)
+		indices, starts, sizes = geometry.face_layout
+		points = np.ascontiguousarray(points, dtype=np.int64)
+		z = np.ascontiguousarray(geometry.rotated[:, 2])
+		face_ids = np.ascontiguousarray(face_ids, dtype=np.int64)
+		triangles = geometry.triangles
+		if fill and triangles is not None:
+			# Fill from the load-time triangles, the outlines still follow the source polygons
+			fill_triangles(self._frame, self._depth, points, z, *triangles, face_ids, hex_to_rgb(fill))
+			draw_outlines(self._frame, self._depth, points, z, indices, starts, sizes, face_ids, hex_to_rgb(line), True)
+		else:
+			draw_faces(
+				self._frame, self._depth, points, z, indices, starts, sizes, face_ids,
+				hex_to_rgb(fill or line), hex_to_rgb(line), bool(fill)
+			)
+		return self._frame
+
+	def render_wireframe(self,
+						 geometry: 'Geometry',
+						 points: np.ndarray,
+						 line: str,
+						 background: str
+	) -> np.ndarray:
+		'''
+		@brief: Draw a frame of the wireframe (the unique edges of the mesh)
+		@param geometry: Geometry whose last transform produced the points
+		@param points: (N, 2) projected points
+		@param line: Line color ('#RRGGBB')
+		@param background: Background color ('#RRGGBB')
+		@return frame: The (H, W, 3) RGB framebuffer
+		'''
+		self._frame[:] = hex_to_rgb(background)
+		edges, _, _ = geometry.wireframe
+		z = np.zeros(len(points))
+		draw_edges(self._frame, self._depth, np.ascontiguousarray(points, dtype=np.int64), z, edges, hex_to_rgb(line))
+		return self._frame
+
+	def to_ppm(self) -> bytes:
+		'''The framebuffer as a binary PPM image (which Tk's PhotoImage reads natively)'''
+		h, w = self._frame.shape[:2]
+		return f'P6 {w} {h} 255 '.encode() + self._frame.tobytes()
+
+
+if __name__ == '__main__':
+	print("This is not the executable file, go to the 'main.py' file and run it instead!")
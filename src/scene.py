@@ -0,0 +1,130 @@
+from mesh import Mesh
+
+import numpy as np
+
+def make_transform(offset: 'tuple(float, float, float)' = (0.0, 0.0, 0.0), scale: float = 1.0, rotation: np.ndarray = None) -> np.ndarray:
+	'''
+	@brief: 4x4 affine transform of an instance: scaled, then rotated, then moved by offset
+	@param rotation: 3x3 rotation matrix (none by default)
+	'''
+	transform = np.eye(4)
+	transform[:3, :3] = (np.eye(3) if rotation is None else np.asarray(rotation, dtype=np.float64))*scale
+	transform[:3, 3] = offset
+	return transform
+
+class Instance:
+	'''A placement of a part in the scene, the mesh of the part is shared by all its instances'''
+	def __init__(self, name: str, part: int, transform: np.ndarray, visible: bool = True) -> None:
+		'''
+		@param part: Index of the part (see Scene.add_part)
+		@param transform: 4x4 affine transform from the part's coordinates to the scene's
+		'''
+		self.name = name
+		self.part = part
+		self.transform = transform
+		self.visible = visible
+
+class Scene:
+	'''
+	Several meshes (parts), each placed one or more times by per-instance transforms.
+	pack() lays the verticies of all the visible instances out in one shared buffer, with their faces
+	concatenated in CSR layout, so that the whole scene is projected in a single batched pass
+	'''
+	def __init__(self) -> None:
+		self._parts = [] # (name, mesh)
+		self._instances = []
+
+	def add_part(self, name: str, mesh: Mesh) -> int:
+		'''Register a mesh without placing it, returns the index of the part'''
+		self._parts.append((name, mesh))
+		return len(self._parts) - 1
+
+	def add_instance(self, part: int, transform: np.ndarray = None, name: str = None, visible: bool = True) -> int:
+		'''
+		@brief: Place a part (once more) in the scene
+		@param transform: 4x4 affine transform (see make_transform), the identity by default
+		@param name: Defaults to the part's name, numbered from its second instance
+		@return: Index of the instance
+		'''
+		if name is None:
+			name = self._parts[part][0]
+			count = sum(instance.part == part for instance in self._instances)
+			if count:
+				name = f'{name} #{count + 1}'
+		self._instances.append(Instance(name, part, make_transform() if transform is None else np.asarray(transform, dtype=np.float64), visible))
+		return len(self._instances) - 1
+
+	def add(self, name: str, mesh: Mesh, transform: np.ndarray = None) -> int:
+		'''Register a mesh as a new part and place it once, returns the index of the instance'''
+		return self.add_instance(self.add_part(name, mesh), transform)
+
+	@property
+	def instances(self) -> 'list(Instance)':
+		return self._instances
+
+	def part_name(self, part: int) -> str:
+		return self._parts[part][0]
+
+	def part_mesh(self, part: int) -> Mesh:
+		return self._parts[part][1]
+
+	def set_visible(self, instance: int, visible: bool) -> None:
+		self._instances[instance].visible = visible
+
+	def set_transform(self, instance: int, transform: np.ndarray) -> None:
+		self._instances[instance].transform = np.asarray(transform, dtype=np.float64)
+
+	@property
+	def visible_count(self) -> int:
+		return sum(instance.visible for instance in self._instances)
+
+	def part_bounds(self, part: int) -> 'tuple(np.ndarray, np.ndarray)':
+		'''(min, max) corners of a part's bounding box, in its own coordinates'''
+		verticies = self._parts[part][1].verticies
+		return verticies.min(axis=0).astype(np.float64), verticies.max(axis=0).astype(np.float64)
+
+	def bounds(self) -> 'tuple(np.ndarray, np.ndarray)':
+		'''
+		@brief: (min, max) corners of the scene's bounding box, hidden instances included (so that
+				the scene is normalized the same way whatever is shown)
+		@Note: Every instance counts for the transformed corners of its part's bounding box
+		'''
+		corners = []
+		for instance in self._instances:
+			low, high = self.part_bounds(instance.part)
+			box = np.array(np.meshgrid(*zip(low, high), indexing='ij')).reshape((3, -1)).T # The 8 corners
+			corners.append(box @ instance.transform[:3, :3].T + instance.transform[:3, 3])
+		corners = np.concatenate(corners)
+		return corners.min(axis=0), corners.max(axis=0)
+
+	def pack(self) -> 'tuple(Mesh, np.ndarray)':
+		'''
+		@brief: The visible instances as a single mesh: the transformed verticies of every instance follow each other
+				in one float32 buffer, and its faces point into its own range of it
+		@return mesh, face_instances: The packed mesh (triangulated if a part is), and the instance every face comes from
+		'''
+		visible = [i for i, instance in enumerate(self._instances) if instance.visible]
+		meshes = [self._parts[self._instances[i].part][1] for i in visible]
+		vertex_counts = np.array([mesh.vertex_count for mesh in meshes], dtype=np.int64)
+		index_counts = np.array([len(mesh.indices) for mesh in meshes], dtype=np.int64)
+		face_counts = np.array([mesh.face_count for mesh in meshes], dtype=np.int64)
+		vertex_starts = np.concatenate(((0,), np.cumsum(vertex_counts)))
+		index_starts = np.concatenate(((0,), np.cumsum(index_counts)))
+
+		verticies = np.empty((vertex_starts[-1], 3), dtype=np.float32)
+		indices = np.empty(index_starts[-1], dtype=np.int64)
+		offsets = np.empty(int(face_counts.sum()) + 1, dtype=np.int64)
+		offsets[-1] = index_starts[-1]
+		face = 0
+		for k, (i, mesh) in enumerate(zip(visible, meshes)):
+			transform = self._instances[i].transform
+			verticies[vertex_starts[k]:vertex_starts[k + 1]] = mesh.verticies @ transform[:3, :3].T.astype(np.float32) + transform[:3, 3].astype(np.float32)
+			indices[index_starts[k]:index_starts[k + 1]] = mesh.indices + vertex_starts[k]
+			offsets[face:face + face_counts[k]] = mesh.starts + index_starts[k]
+			face += face_counts[k]
+
+		packed = Mesh(verticies, indices, offsets)
+		if any(mesh.triangulated for mesh in meshes):
+			packed.triangulate()
+		face_instances = np.repeat(np.array(visible, dtype=np.int32), face_counts)
+		return packed, face_instances
@@ -0,0 +1,58 @@
+import time
+import typing
+
+if typing.TYPE_CHECKING:
+	import tkinter as tk
+
+class FrameScheduler:
+	'''
+	Event-driven redraws on top of the Tk event loop.
+	Nothing runs while nothing is dirty, redraw requests are coalesced into (at most) one
+	pending frame, and frames are paced so that they never exceed the target FPS.
+	A frame that runs long doesn't pile up redraws: the requests made meanwhile collapse into the next frame
+	'''
+	def __init__(self, widget: 'tk.Misc', render: 'callable', target_fps: float = 60) -> None:
+		'''
+		@param widget: Any Tk widget, used to schedule the frames
+		@param render: Draws a frame, returns True if it needs another one (e.g. an ongoing animation)
+		@param target_fps: Maximum number of frames per second
+		'''
+		self._widget = widget
+		self._render = render
+		self._pending = None # Tk id of the scheduled frame
+		self._last_frame = 0.0
+		self._frames_dropped = 0
+		self.set_target_fps(target_fps)
+
+	def set_target_fps(self, target_fps: float) -> None:
+		self._interval = 1/max(target_fps, 1)
+
+	@property
+	def target_fps(self) -> float:
+		return 1/self._interval
+
+	@property
+	def frames_dropped(self) -> int:
+		'''Redraw requests that got merged into an already pending frame'''
+		return self._frames_dropped
+
+	def request(self, *args) -> None:
+		'''Ask for a redraw (can be used as a Tk callback)'''
+		if self._pending is not None:
+			self._frames_dropped += 1
+			return
+		# Wait for the end of the current frame interval, at least 1ms so that input events get through
+		delay = self._interval - (time.perf_counter() - self._last_frame)
+		self._pending = self._widget.after(max(int(delay*1000), 1), self.__run)
+
+	def cancel(self) -> None:
+		'''Drop the pending frame'''
+		if self._pending is not None:
+			self._widget.after_cancel(self._pending)
+			self._pending = None
+
+	def __run(self) -> None:
+		self._pending = None
+		self._last_frame = time.perf_counter()
+		if self._render():
+			self.request()
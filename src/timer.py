@@ -1,10 +1,124 @@
+import os
 import time
+import functools
+import contextlib
+import numpy as np
 
-def time_me(f):
-	'''Decorator function to time functions' runtime in ms'''
-	def wrapper(*args, **kwargs):
-		start = time.time()
-		res = f(*args, **kwargs)
-		print(f'function: {f.__name__} took {(time.time()-start)*1000:.4f}ms')
-		return res
-	return wrapper
\ No newline at end of file
+class Timer:
+	'''Rolling record of the last durations of a named metric (a ring buffer of nanoseconds)'''
+	def __init__(self, name: str, capacity: int) -> None:
+		self.name = name
+		self._samples = [0]*capacity
+		self._count = 0
+
+	def record(self, duration_ns: int) -> None:
+		self._samples[self._count % len(self._samples)] = duration_ns
+		self._count += 1
+
+	@property
+	def count(self) -> int:
+		'''Number of durations recorded since the creation (or the last reset)'''
+		return self._count
+
+	@property
+	def last(self) -> float:
+		'''Last recorded duration in ms'''
+		return self._samples[(self._count - 1) % len(self._samples)]/1e6 if self._count else 0.0
+
+	def window(self) -> np.ndarray:
+		'''Recorded durations still in the ring buffer, in ms'''
+		return np.array(self._samples[:min(self._count, len(self._samples))], dtype=np.float64)/1e6
+
+	def stats(self) -> dict:
+		'''p50/p95/p99/max/mean (in ms) of the durations still in the ring buffer'''
+		window = self.window()
+		if not len(window):
+			return {'count': 0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0, 'mean': 0.0}
+		p50, p95, p99 = np.percentile(window, (50, 95, 99))
+		return {'count': self._count, 'p50': p50, 'p95': p95, 'p99': p99, 'max': window.max(), 'mean': window.mean()}
+
+	def reset(self) -> None:
+		self._count = 0
+
+class Profiler:
+	'''
+	Registry of named timers.
+	While disabled, the timed functions and spans only cost a flag check
+	'''
+	def __init__(self, capacity: int = 512, enabled: bool = False) -> None:
+		'''
+		@param capacity: Number of durations each timer keeps
+		@param enabled: Whether the timings are recorded from the start
+		'''
+		self._capacity = capacity
+		self._enabled = enabled
+		self._timers = {}
+
+	@property
+	def enabled(self) -> bool:
+		return self._enabled
+
+	def enable(self) -> None:
+		self._enabled = True
+
+	def disable(self) -> None:
+		self._enabled = False
+
+	def timer(self, name: str) -> Timer:
+		'''Get a timer by name, created on first use'''
+		if name not in self._timers:
+			self._timers[name] = Timer(name, self._capacity)
+		return self._timers[name]
+
+	def record(self, name: str, duration_ns: int) -> None:
+		'''Record a duration measured elsewhere'''
+		if self._enabled:
+			self.timer(name).record(duration_ns)
+
+	def timed(self, name: str) -> 'callable':
+		'''Decorator recording the runtime of every call of a function under the given name'''
+		def decorator(f):
+			timer = self.timer(name)
+			@functools.wraps(f)
+			def wrapper(*args, **kwargs):
+				if not self._enabled:
+					return f(*args, **kwargs)
+				start = time.perf_counter_ns()
+				try:
+					return f(*args, **kwargs)
+				finally:
+					timer.record(time.perf_counter_ns() - start)
+			return wrapper
+		return decorator
+
+	@contextlib.contextmanager
+	def __timed_span(self, timer: Timer):
+		start = time.perf_counter_ns()
+		try:
+			yield
+		finally:
+			timer.record(time.perf_counter_ns() - start)
+
+	def span(self, name: str) -> 'contextlib.AbstractContextManager':
+		'''Context manager recording the runtime of its block under the given name'''
+		if not self._enabled:
+			return contextlib.nullcontext()
+		return self.__timed_span(self.timer(name))
+
+	def report(self) -> dict:
+		'''Stats of every timer that recorded something, by name'''
+		return {name: timer.stats() for name, timer in self._timers.items() if timer.count}
+
+	def format_report(self) -> str:
+		'''The report as a table (durations in ms)'''
+		lines = [f"{'metric':<12}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"]
+		for name, stats in self.report().items():
+			lines.append(f"{name:<12}{stats['count']:>8}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}{stats['max']:>10.3f}")
+		return '\n'.join(lines)
+
+	def reset(self) -> None:
+		for timer in self._timers.values():
+			timer.reset()
+
+# The registry used across the app, set VIZ_PROFILE=1 to enable it from the start
+profiler = Profiler(enabled=os.environ.get('VIZ_PROFILE', '0') not in ('', '0'))
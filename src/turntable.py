@@ -0,0 +1,155 @@
+'''
+Turntable export: N frames of a full turn around an axis, rendered offscreen in parallel (one process per core),
+then encoded as an animated GIF (needs Pillow) or written as a numbered PNG sequence. Run it from the src folder:
+	python -m turntable ../Objects/Tank.obj --frames 360 --out tank.gif
+	python -m turntable ../Objects/Tank.obj --frames 360 --out frames/tank.png   # frames/tank_0000.png, ...
+'''
+import obj_files_handler
+import offscreen
+from geometry import Geometry
+from rasterizer import Rasterizer
+
+import os
+import sys
+import math
+import time
+import typing
+import argparse
+import multiprocessing
+
+if typing.TYPE_CHECKING:
+	import numpy as np
+	from mesh import Mesh
+
+try:
+	from PIL import Image
+except ImportError: # Only needed for the GIF output
+	Image = None
+
+AXES = 'xyz'
+PILLOW_MISSING = 'Pillow is needed to write GIF files (pip install pillow), export a PNG sequence instead'
+
+_worker = {} # State of a pool process: its own geometry and rasterizer, set up once by _init_worker
+
+def _init_worker(mesh: 'Mesh', pose: dict, style: dict) -> None:
+	geometry = Geometry(pose['width'], pose['height'], lod_targets=())
+	# Already normalized (with the bounds of the whole scene in the GUI), normalizing it again would move it
+	geometry.upload_object(mesh, normalize=False)
+	geometry.set_zoom(pose['zoom'])
+	geometry.set_position(*pose['position'])
+	geometry.set_object_scale(pose['scale'])
+	_worker.update(geometry=geometry, rasterizer=Rasterizer(pose['width'], pose['height']), pose=pose, style=style)
+
+def _render_frame(i: int) -> 'np.ndarray':
+	'''Render frame i of the turn, write it to disk if a PNG sequence is exported (and return None), else return it'''
+	geometry, pose = _worker['geometry'], _worker['pose']
+	angles = list(pose['orientation'])
+	angles[pose['axis']] += 2*math.pi*i/pose['frames']
+	geometry.reset_rotation(*angles)
+	frame = offscreen.render_view(geometry, pose['width'], pose['height'], rasterizer=_worker['rasterizer'], **_worker['style'])
+	if pose['pattern']:
+		offscreen.write_png(pose['pattern'].format(i), frame)
+		return None
+	return frame
+
+def sequence_pattern(path: str, frames: int) -> str:
+	'''"dir/name.png" to "dir/name_{:04d}.png" (enough digits for the number of frames)'''
+	root, ext = os.path.splitext(path)
+	return f'{root}_{{:0{max(len(str(frames - 1)), 4)}d}}{ext or ".png"}'
+
+def save_gif(path: str, frames: 'list(np.ndarray)', fps: float) -> None:
+	'''Encode RGB frames as a looping animated GIF'''
+	if Image is None:
+		raise RuntimeError(PILLOW_MISSING)
+	images = [Image.fromarray(frame).convert('P', palette=Image.ADAPTIVE) for frame in frames]
+	images[0].save(path, save_all=True, append_images=images[1:], duration=int(round(1000/fps)), loop=0, optimize=False)
+
+def snapshot(geometry: Geometry,
+			 path: str,
+			 frames: int,
+			 axis: str = 'y',
+			 size: 'tuple(int, int)' = None,
+			 canvas_size: 'tuple(int, int)' = None
+) -> dict:
+	'''
+	@brief: Everything a turntable export needs from the geometry: its full mesh and current pose (zoom, position, scale, orientation).
+			Take it where the geometry is used (e.g. the Tk thread), the export itself can then run anywhere
+	@param path: .gif file, or .png file used as the pattern of a numbered sequence (name_0000.png, ...)
+	@param axis: 'x', 'y' or 'z', the axis the object turns around
+	@param size: (width, height) of the frames, the canvas size by default
+	@param canvas_size: (width, height) of the canvas the geometry is placed on, the pose is scaled from it to the frames size
+	'''
+	canvas_size = canvas_size or size
+	size = size or canvas_size
+	ratio = size[0]/canvas_size[0]
+	x, y = geometry.position
+	gif = path.lower().endswith('.gif')
+	return {
+		'path': path, 'gif': gif, 'mesh': geometry.mesh(),
+		'pose': {
+			'width': size[0], 'height': size[1], 'zoom': geometry.zoom, 'position': (int(x*ratio), int(y*ratio)),
+			'scale': geometry.object_scale*ratio, 'orientation': geometry.orientation,
+			'axis': AXES.index(axis), 'frames': frames, 'pattern': None if gif else sequence_pattern(path, frames),
+		},
+	}
+
+def export(snapshot: dict, fps: float = 30, jobs: int = None, **style) -> int:
+	'''
+	@brief: Render the turntable of a snapshot and write it
+	@param jobs: Number of processes (all the cores by default)
+	@param style: fill, line, background, cull_back_faces, wireframe (see offscreen.render_view)
+	@return: Number of frames written
+	'''
+	if snapshot['gif'] and Image is None:
+		raise RuntimeError(PILLOW_MISSING)
+	frames = snapshot['pose']['frames']
+	jobs = max(min(jobs or os.cpu_count(), frames), 1)
+	# Spawned processes: forking a process that runs Tk (and numba threads) isn't safe
+	initargs = (snapshot['mesh'], snapshot['pose'], style)
+	with multiprocessing.get_context('spawn').Pool(jobs, _init_worker, initargs) as pool:
+		rendered = pool.map(_render_frame, range(frames), chunksize=max(frames//(4*jobs), 1))
+	if snapshot['gif']:
+		save_gif(snapshot['path'], rendered, fps)
+	return frames
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Render a turntable of a .obj file to an animated GIF or a PNG sequence')
+	parser.add_argument('model', help='.obj file to render')
+	parser.add_argument('--out', required=True, help='.gif file, or .png file used as the pattern of a numbered sequence')
+	parser.add_argument('--frames', type=int, default=120, help='Frames of the full turn (default: %(default)s)')
+	parser.add_argument('--axis', choices=AXES, default='y', help='Axis the object turns around (default: %(default)s)')
+	parser.add_argument('--view', default='0,0,0', metavar='X,Y,Z', help='Starting orientation in degrees (default: %(default)s)')
+	parser.add_argument('--zoom', type=float, default=5.0, help='The lower the stronger the perspective (default: %(default)s)')
+	parser.add_argument('--size', type=int, nargs=2, default=(480, 480), metavar=('WIDTH', 'HEIGHT'), help='Frames size (default: 480 480)')
+	parser.add_argument('--fps', type=float, default=30, help='GIF frame rate (default: %(default)s)')
+	parser.add_argument('--fill', default='#000000', help="Fill color, '' for no fill (default: %(default)s)")
+	parser.add_argument('--line', default='#0000FF', help='Line color (default: %(default)s)')
+	parser.add_argument('--background', default='#FFFFFF', help='Background color (default: %(default)s)')
+	parser.add_argument('--cull', action='store_true', help='Cull the back faces')
+	parser.add_argument('--wireframe', action='store_true', help='Draw the unique edges only')
+	parser.add_argument('--triangulate', action='store_true', help='Triangulate the faces when loading them (the fill of concave polygons stays right)')
+	parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Number of worker processes (default: %(default)s)')
+	args = parser.parse_args()
+
+	with open(args.model) as file:
+		mesh = obj_files_handler.extract_data(file, args.triangulate)
+	geometry = Geometry(*args.size, lod_targets=())
+	geometry.upload_object(mesh)
+	geometry.set_zoom(args.zoom)
+	geometry.reset_rotation(*(math.radians(float(angle)) for angle in args.view.split(',')))
+	# Leave room for the parts that stick out while turning
+	offscreen.fit_view(geometry, *args.size, margin=0.15)
+
+	directory = os.path.dirname(args.out)
+	if directory:
+		os.makedirs(directory, exist_ok=True)
+	start = time.perf_counter()
+	export(snapshot(geometry, args.out, args.frames, args.axis, tuple(args.size)), fps=args.fps, jobs=args.jobs,
+		   fill=args.fill, line=args.line, background=args.background, cull_back_faces=args.cull, wireframe=args.wireframe)
+	elapsed = time.perf_counter() - start
+	print(f'{args.frames} frames in {elapsed:.2f}s ({args.frames/elapsed:.1f} frames/s with {args.jobs} process(es)) -> {args.out}')
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,14 @@
+import pytest
+
+from geometry import default_threads, max_threads
+
+def test_threads_from_environment(monkeypatch):
+	monkeypatch.setenv('VIZ_THREADS', '2')
+	assert default_threads() == 2
+	monkeypatch.delenv('VIZ_THREADS')
+	assert default_threads() == max_threads()
+
+def test_malformed_threads_fall_back_to_all(monkeypatch):
+	monkeypatch.setenv('VIZ_THREADS', 'four')
+	with pytest.warns(RuntimeWarning, match='VIZ_THREADS'):
+		assert default_threads() == max_threads()
@@ -0,0 +1,25 @@
+import os
+
+import numpy as np
+import pytest
+
+import obj_files_handler
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def test_inline_comments():
+	with open(os.path.join(FIXTURES, 'inline_comments.obj')) as file:
+		verticies, indices, sizes = obj_files_handler.parse_obj(file.read())
+	assert verticies.shape == (4, 3)
+	assert np.array_equal(verticies[2], (1.0, 1.0, 0.0))
+	assert sizes.tolist() == [3, 3]
+	assert indices.tolist() == [1, 2, 3, 1, 3, 4]
+
+@pytest.mark.parametrize('data', [
+	"v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 x\n", # Not an index
+	"v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 4\n", # Undefined vertex
+	"v 0 0 0\nv 1 0\nv 0 1 0\nf 1 2 3\n",   # Missing coordinate
+])
+def test_malformed_data(data):
+	with pytest.raises(ValueError):
+		obj_files_handler.parse_obj(data)
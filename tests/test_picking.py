@@ -0,0 +1,30 @@
+import numpy as np
+
+from picking import PickIndex
+
+def layout(faces: 'list(list(int))') -> 'tuple(np.ndarray, np.ndarray, np.ndarray)':
+	sizes = np.array([len(face) for face in faces], dtype=np.int64)
+	starts = np.concatenate(((0,), np.cumsum(sizes)[:-1])).astype(np.int64)
+	indices = np.array([i for face in faces for i in face], dtype=np.int64)
+	return indices, starts, sizes
+
+def test_skipped_faces_are_not_binned():
+	# An empty face, faces off the grid on every side and one starting right on its right edge
+	points = np.array([
+		(10, 10), (30, 10), (20, 30),                # 0-2: on the grid
+		(-50, -50), (-40, -50), (-45, -40),          # 3-5: above and left of it
+		(500, 500), (510, 500), (505, 510),          # 6-8: below and right of it
+		(64, 10), (70, 10), (67, 20),                # 9-11: starts at x == width
+	], dtype=np.int64)
+	faces = [[0, 1, 2], [], [3, 4, 5], [6, 7, 8], [9, 10, 11]]
+	index = PickIndex(points, layout(faces), np.arange(len(faces)), (64, 64))
+	assert index.pick(20, 15) == 0
+	assert index.pick(63, 15) == -1
+	assert index.pick(0, 63) == -1
+
+def test_pick_closest_face():
+	points = np.array([(0, 0), (40, 0), (0, 40), (0, 0), (40, 0), (0, 40)], dtype=np.int64)
+	faces = [[0, 1, 2], [3, 4, 5]]
+	index = PickIndex(points, layout(faces), np.arange(2), (64, 64))
+	assert index.pick(5, 5) == 1
+	assert index.pick(5, 5, z=np.array((1.0, 1.0, 1.0, 0.0, 0.0, 0.0))) == 0